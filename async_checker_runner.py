@@ -1,29 +1,44 @@
 from PySide6.QtCore import QObject, Signal
 from loguru import logger
 import asyncio
+import sys
+
+try:
+    import uvloop  # libuv实现的事件循环，调度开销远低于纯Python实现
+except ImportError:
+    uvloop = None
+
+def _new_event_loop():
+    """创建事件循环，优先使用uvloop（Windows上不可用，回退到默认实现）"""
+    if uvloop is not None and sys.platform != 'win32':
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
 
 class AsyncCheckerRunner(QObject):
     """运行异步检查器的包装类"""
     progress_updated = Signal(int, int, int)
     status_updated = Signal(str)
+    stream_updated = Signal(int, dict)
     finished = Signal(list)
-    
+
     def __init__(self, checker, streams):
         super().__init__()
         self.checker = checker
         self.streams = streams
-        
+
     def run(self):
         """运行异步检查"""
         # 设置回调
         self.checker.set_callbacks(
             progress_callback=self._progress_callback,
-            status_callback=self._status_callback
+            status_callback=self._status_callback,
+            stream_checked_callback=self._stream_checked_callback
         )
         
         # 创建并运行事件循环
         try:
-            loop = asyncio.new_event_loop()
+            # 在当前线程内创建事件循环（runner运行在独立的QThread中）
+            loop = _new_event_loop()
             asyncio.set_event_loop(loop)
             results = loop.run_until_complete(self.checker.check_all_streams(self.streams))
             self.finished.emit(results)
@@ -37,4 +52,8 @@ class AsyncCheckerRunner(QObject):
         
     def _status_callback(self, message):
         """状态回调"""
-        self.status_updated.emit(message) 
\ No newline at end of file
+        self.status_updated.emit(message)
+
+    def _stream_checked_callback(self, index, stream):
+        """单个流检查完成回调"""
+        self.stream_updated.emit(index, stream)
\ No newline at end of file
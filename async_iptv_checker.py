@@ -1,268 +1,436 @@
-import asyncio
-import aiohttp
-import time
-from loguru import logger
-import concurrent.futures
-import signal
-import os
-import threading
-
-class AsyncIPTVChecker:
-    """异步IPTV流检查器，用于高并发场景"""
-    
-    def __init__(self, request_timeout=5, max_concurrency=100):
-        self.request_timeout = request_timeout
-        self.max_concurrency = max_concurrency
-        self._stop_requested = False
-        self.progress_callback = None
-        self.status_callback = None
-        self._running_tasks = set()
-        self._running_threads = []
-    
-    def set_callbacks(self, progress_callback=None, status_callback=None):
-        """设置进度和状态回调"""
-        self.progress_callback = progress_callback
-        self.status_callback = status_callback
-    
-    async def check_stream(self, stream, session):
-        """异步检查单个流"""
-        if self._stop_requested:
-            return stream
-            
-        url = stream.get('url', '')
-        if not url:
-            stream['status'] = '无效源'
-            stream['resolution'] = 'N/A'
-            stream['response_time'] = -1
-            return stream
-            
-        start_time = time.time()
-        
-        try:
-            # 快速检查URL是否可访问
-            try:
-                # 使用更短的超时快速检查可访问性
-                check_timeout = min(1.0, self.request_timeout / 2)
-                async with session.head(
-                    url, 
-                    timeout=check_timeout,
-                    allow_redirects=True
-                ) as response:
-                    if response.status != 200:
-                        # 如果HEAD请求失败，尝试GET请求
-                        try:
-                            async with session.get(
-                                url, 
-                                timeout=check_timeout,
-                                allow_redirects=True
-                            ) as get_response:
-                                if get_response.status != 200:
-                                    stream['status'] = '无效源'
-                                    stream['resolution'] = 'N/A'
-                                    stream['response_time'] = round((time.time() - start_time) * 1000)
-                                    return stream
-                                # 仅读取少量数据确认
-                                await get_response.content.read(1024)
-                        except Exception:
-                            stream['status'] = '无效源'
-                            stream['resolution'] = 'N/A'
-                            stream['response_time'] = round((time.time() - start_time) * 1000)
-                            return stream
-            except Exception:
-                # 如果所有HTTP检查都失败，尝试直接获取流信息
-                pass
-            
-            # 使用线程池执行器运行获取流信息的任务
-            try:
-                # 创建一个事件用于超时控制
-                done_event = threading.Event()
-                result_container = {"resolution": "N/A", "status": "TIMEOUT"}
-                
-                # 创建一个线程执行阻塞操作
-                thread = threading.Thread(
-                    target=self._thread_get_stream_info,
-                    args=(url, self.request_timeout, result_container, done_event)
-                )
-                thread.daemon = True
-                self._running_threads.append(thread)
-                thread.start()
-                
-                # 等待线程完成或超时
-                timeout = min(self.request_timeout, 3.0)  # 最多等待3秒
-                await asyncio.sleep(0.01)  # 让出控制权给事件循环
-                
-                # 使用asyncio创建超时任务
-                try:
-                    # 创建一个超时任务
-                    async def wait_for_thread():
-                        for _ in range(int(timeout * 100)):  # 转为100毫秒的检查间隔
-                            if done_event.is_set() or self._stop_requested:
-                                break
-                            await asyncio.sleep(0.01)  # 小间隔检查，保持响应性
-                        return done_event.is_set()
-                    
-                    # 等待线程完成或超时
-                    thread_completed = await wait_for_thread()
-                    
-                    if not thread_completed:
-                        # 超时，标记结果
-                        result_container["status"] = "TIMEOUT"
-                        # 线程会自行终止（它是daemon线程）
-                        if thread in self._running_threads:
-                            self._running_threads.remove(thread)
-                    else:
-                        # 线程已完成，使用其结果
-                        if thread in self._running_threads:
-                            self._running_threads.remove(thread)
-                
-                except Exception as e:
-                    logger.error(f"等待线程时出错: {str(e)}")
-                    result_container["status"] = f"错误: {str(e)[:30]}"
-                
-                # 更新流数据
-                resolution = result_container["resolution"]
-                status = result_container["status"]
-                
-            except Exception as e:
-                logger.error(f"获取流信息时出错 {url}: {str(e)}")
-                resolution = "N/A"
-                status = f"错误: {str(e)[:30]}"
-            
-            # 更新流数据
-            stream['resolution'] = resolution
-            stream['status'] = '正常' if status == "OK" else '无效源'
-            stream['response_time'] = round((time.time() - start_time) * 1000)
-            
-            return stream
-        except Exception as e:
-            logger.error(f"异步检查流错误 {url}: {str(e)}")
-            stream['status'] = '无效源'
-            stream['resolution'] = 'N/A'
-            stream['response_time'] = round((time.time() - start_time) * 1000)
-            return stream
-    
-    def _thread_get_stream_info(self, url, timeout, result_container, done_event):
-        """在线程中获取流信息"""
-        try:
-            # 导入这里以避免全局污染
-            from iptv_player import IPTVPlayer
-            player = IPTVPlayer()
-            # 获取流信息
-            resolution, status = player.get_stream_info(url, timeout=timeout)
-            # 存储结果
-            result_container["resolution"] = resolution
-            result_container["status"] = status
-        except Exception as e:
-            logger.error(f"线程中获取流信息错误: {str(e)}")
-            result_container["status"] = f"错误: {str(e)[:30]}"
-        finally:
-            # 标记完成
-            done_event.set()
-    
-    async def check_all_streams(self, streams):
-        """异步并发检查所有流"""
-        if not streams:
-            return []
-            
-        self._stop_requested = False
-        self._running_tasks = set()
-        self._running_threads = []
-        
-        # 创建一个用于限制并发的信号量
-        semaphore = asyncio.Semaphore(self.max_concurrency)
-        
-        # 定义包装的检查函数
-        async def check_with_semaphore(stream, session):
-            async with semaphore:
-                return await self.check_stream(stream, session)
-        
-        # 优化的TCP连接器
-        conn = aiohttp.TCPConnector(
-            limit=0,  # 无连接数限制
-            ttl_dns_cache=300,  # DNS缓存时间
-            force_close=True,  # 强制关闭连接
-            enable_cleanup_closed=True  # 清理已关闭连接
-        )
-        
-        # 客户端会话超时设置
-        timeout = aiohttp.ClientTimeout(
-            total=self.request_timeout,
-            connect=min(2.0, self.request_timeout),
-            sock_connect=min(2.0, self.request_timeout),
-            sock_read=self.request_timeout
-        )
-        
-        # 创建客户端会话
-        async with aiohttp.ClientSession(
-            connector=conn, 
-            timeout=timeout
-        ) as session:
-            # 提交所有任务
-            tasks = []
-            for stream in streams:
-                task = asyncio.create_task(check_with_semaphore(stream, session))
-                tasks.append(task)
-                self._running_tasks.add(task)
-                task.add_done_callback(self._running_tasks.discard)
-            
-            # 等待所有任务完成或任务被取消
-            results = []
-            for i, task_future in enumerate(asyncio.as_completed(tasks)):
-                if self._stop_requested:
-                    # 取消剩余任务
-                    for task in tasks:
-                        if not task.done():
-                            task.cancel()
-                    # 终止所有运行中的线程
-                    self._terminate_running_threads()
-                    break
-                
-                try:
-                    result = await task_future
-                    results.append(result)
-                    
-                    # 更新进度
-                    if self.progress_callback and not self._stop_requested:
-                        progress = int(len(results) / len(streams) * 100)
-                        self.progress_callback(progress, len(results), len(streams))
-                    
-                    # 更新状态
-                    if self.status_callback and not self._stop_requested:
-                        self.status_callback(f"已检查 {len(results)}/{len(streams)} 流")
-                    
-                    # 定期让出控制权，保持UI响应
-                    if i % 10 == 0:  # 每10个任务
-                        await asyncio.sleep(0.001)  # 短暂让出控制权
-                        
-                except asyncio.CancelledError:
-                    logger.debug("任务被取消")
-                    continue
-                except Exception as e:
-                    logger.error(f"任务错误: {str(e)}")
-                    continue
-            
-            return results
-    
-    def _terminate_running_threads(self):
-        """终止所有运行中的线程"""
-        # 注意: 这并不总是安全的，但在这里我们确保所有线程都是daemon线程
-        for thread in self._running_threads[:]:
-            # 线程是daemon线程，当主程序退出时会自动终止
-            # 这里只从列表中移除
-            if thread in self._running_threads:
-                self._running_threads.remove(thread)
-    
-    def stop_check(self):
-        """停止检查"""
-        self._stop_requested = True
-        
-        # 取消所有正在运行的任务
-        for task in self._running_tasks:
-            if not task.done():
-                task.cancel()
-        
-        # 终止所有运行中的线程
-        self._terminate_running_threads()
-        
-        if self.status_callback:
-            self.status_callback("停止流检查...")
+import asyncio
+import aiohttp
+import re
+import time
+from loguru import logger
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlsplit
+import signal
+import os
+import sys
+import socket
+import threading
+
+# 驻留的状态常量：所有流共享同一字符串对象，上万行时省去重复分配
+STATUS_OK = sys.intern('正常')
+STATUS_INVALID = sys.intern('无效源')
+STATUS_SKIPPED = sys.intern('无效源(已跳过)')
+
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+@lru_cache(maxsize=4096)
+def _split_url(url):
+    """缓存URL解析结果，避免对相同URL重复解析"""
+    return urlsplit(url)
+
+# 每个工作线程各持有一个IPTVPlayer实例（线程池大小有上限，总量可控）
+_tls = threading.local()
+
+# 合法流URL的快速校验：主机名+可选端口+可选路径，支持常见流媒体协议
+_URL_RE = re.compile(
+    r"^(?:https?|rtmp|rtsp)://[A-Za-z0-9.\-]+(?::\d+)?(?:/\S*)?$",
+    re.IGNORECASE
+)
+
+class AsyncIPTVChecker:
+    """异步IPTV流检查器，用于高并发场景"""
+
+    def __init__(self, request_timeout=5, max_concurrency=100):
+        self.request_timeout = request_timeout
+        self.max_concurrency = max_concurrency
+        self._stop_requested = False
+        self.progress_callback = None
+        self.status_callback = None
+        self.stream_checked_callback = None  # 单个流完成后的回调：(索引, 流信息)
+        self.skip_same_domain_invalid = False  # 是否跳过同一主机下的无效源
+        self._dns_cache = {}  # 主机名 -> IP（解析失败为None）
+        # 基于条件变量的并发准入控制，支持检查过程中动态调整上限
+        self._limit = max_concurrency
+        self._inflight = 0
+        self._cond = None
+        self._running_tasks = set()
+        # 停止事件和所属事件循环，用于在stop_check时立即唤醒等待中的检测
+        self._stop_event = None
+        self._loop = None
+        # 共享线程池，用于执行阻塞的流信息检测，避免每个URL创建一个新线程
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="iptv-probe"
+        )
+    
+    def set_callbacks(self, progress_callback=None, status_callback=None,
+                      stream_checked_callback=None):
+        """设置进度、状态和单流完成回调"""
+        self.progress_callback = progress_callback
+        self.status_callback = status_callback
+        self.stream_checked_callback = stream_checked_callback
+    
+    async def check_stream(self, stream, session):
+        """异步检查单个流"""
+        if self._stop_requested:
+            return stream
+            
+        url = stream.get('url', '')
+        if not url:
+            stream['status'] = STATUS_INVALID
+            stream['resolution'] = 'N/A'
+            stream['response_time'] = -1
+            return stream
+
+        # 单调时钟的纳秒计数：不受系统时间跳变影响，整数除法也比浮点round更快
+        start_ns = time.monotonic_ns()
+
+        try:
+            # 快速检查URL是否可访问：单次带Range头的GET。
+            # 许多IPTV边缘服务器对HEAD返回405/403，原先的HEAD+GET回退
+            # 在慢路径上要多付一次完整往返
+            try:
+                # 使用更短的超时快速检查可访问性
+                check_timeout = min(1.0, self.request_timeout / 2)
+                async with session.get(
+                    url,
+                    headers={"Range": "bytes=0-511"},
+                    timeout=check_timeout,
+                    allow_redirects=True
+                ) as response:
+                    if response.status not in (200, 206):
+                        return self._finalize(stream, STATUS_INVALID, 'N/A', start_ns)
+                    # 仅读取少量数据确认
+                    try:
+                        await response.content.read(512)
+                    except aiohttp.ClientPayloadError:
+                        # Range短读触发的负载错误，流本身存在
+                        pass
+            except Exception:
+                # 如果HTTP检查失败，尝试直接获取流信息
+                pass
+            
+            # 使用共享线程池运行获取流信息的任务
+            try:
+                # 最多等待3秒，超时后由wait_for统一处理
+                probe_timeout = min(self.request_timeout, 3.0)
+                loop = asyncio.get_running_loop()
+                probe_future = loop.run_in_executor(
+                    self._executor,
+                    self._probe_stream_info, url, self.request_timeout
+                )
+                # 同时等待检测结果和停止事件，停止请求可以立即生效而无需轮询
+                stop_waiter = asyncio.ensure_future(self._stop_event.wait())
+                done, _pending = await asyncio.wait(
+                    {probe_future, stop_waiter},
+                    timeout=probe_timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not stop_waiter.done():
+                    stop_waiter.cancel()
+                if probe_future in done:
+                    resolution, status = probe_future.result()
+                else:
+                    # 超时或收到停止请求，放弃本次检测
+                    probe_future.cancel()
+                    resolution, status = "N/A", "TIMEOUT"
+
+            except Exception as e:
+                logger.error("获取流信息时出错 {}: {}", url, e)
+                resolution = "N/A"
+                status = f"错误: {str(e)[:30]}"
+            
+            # 更新流数据
+            return self._finalize(
+                stream, STATUS_OK if status == "OK" else STATUS_INVALID, resolution, start_ns
+            )
+        except Exception as e:
+            logger.error("异步检查流错误 {}: {}", url, e)
+            return self._finalize(stream, STATUS_INVALID, 'N/A', start_ns)
+    
+    @staticmethod
+    def _finalize(stream, status, resolution, start_ns):
+        """写入检查结果并以整数毫秒记录耗时"""
+        stream['status'] = status
+        stream['resolution'] = resolution
+        stream['response_time'] = (time.monotonic_ns() - start_ns) // 1_000_000
+        return stream
+
+    def _probe_stream_info(self, url, timeout):
+        """在线程池中获取流信息"""
+        try:
+            # 导入这里以避免全局污染
+            from iptv_player import IPTVPlayer
+            # 复用当前线程的播放器实例，省去每个URL一次的构建开销
+            player = getattr(_tls, "player", None)
+            if player is None:
+                player = IPTVPlayer()
+                _tls.player = player
+            # 获取流信息
+            return player.get_stream_info(url, timeout=timeout)
+        except Exception as e:
+            logger.error("线程池中获取流信息错误: {}", e)
+            return "N/A", f"错误: {str(e)[:30]}"
+
+    async def _acquire_slot(self):
+        """申请一个并发名额，达到上限时等待（停止请求会立即放行）"""
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: self._inflight < self._limit or self._stop_requested
+            )
+            self._inflight += 1
+
+    async def _release_slot(self):
+        """释放并发名额并唤醒一个等待者"""
+        async with self._cond:
+            self._inflight -= 1
+            self._cond.notify(1)
+
+    def set_limit(self, limit):
+        """动态调整并发上限，检查进行中也可以安全调用"""
+        self._limit = max(1, int(limit))
+        self._notify_waiters()
+
+    def _notify_waiters(self):
+        """线程安全地唤醒所有等待并发名额的协程"""
+        if self._loop is None or self._cond is None:
+            return
+
+        def _wake():
+            async def _notify():
+                async with self._cond:
+                    self._cond.notify_all()
+            asyncio.ensure_future(_notify())
+
+        self._loop.call_soon_threadsafe(_wake)
+
+    async def _preresolve_hosts(self, hosts):
+        """批量预解析主机名，成功和失败的结果都缓存到_dns_cache"""
+        pending = [h for h in hosts if h and h not in self._dns_cache]
+        if not pending:
+            return
+
+        loop = asyncio.get_running_loop()
+        # DNS查询使用独立的小信号量，避免一次性打爆解析器
+        semaphore = asyncio.Semaphore(50)
+
+        if aiodns:
+            resolver = aiodns.DNSResolver(loop=loop)
+
+            async def resolve(host):
+                async with semaphore:
+                    try:
+                        result = await resolver.gethostbyname(host, socket.AF_INET)
+                        return host, result.addresses[0] if result.addresses else None
+                    except Exception:
+                        return host, None
+        else:
+            # 没有aiodns时退回到事件循环的getaddrinfo（在线程池中执行）
+            async def resolve(host):
+                async with semaphore:
+                    try:
+                        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET)
+                        return host, infos[0][4][0] if infos else None
+                    except Exception:
+                        return host, None
+
+        for host, ip in await asyncio.gather(*(resolve(h) for h in pending)):
+            self._dns_cache[host] = ip
+        failed = sum(1 for h in pending if self._dns_cache.get(h) is None)
+        if failed:
+            logger.debug("DNS预解析: {} 个主机中有 {} 个无法解析", len(pending), failed)
+
+    async def check_all_streams(self, streams):
+        """异步并发检查所有流"""
+        if not streams:
+            return []
+            
+        self._stop_requested = False
+        self._running_tasks = set()
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._cond = asyncio.Condition()
+        self._inflight = 0
+
+        # 从设置中加载skip_same_domain_invalid选项
+        try:
+            from config import SKIP_SAME_DOMAIN_INVALID
+            self.skip_same_domain_invalid = SKIP_SAME_DOMAIN_INVALID
+        except ImportError:
+            pass
+
+        # 如果上一次检查时线程池已被关闭，则重新创建
+        if self._executor._shutdown:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="iptv-probe"
+            )
+
+        # 优化的TCP连接器：保持keep-alive连接池，
+        # 同一主机的多个流可以复用连接，省去重复的TCP/TLS握手
+        conn = aiohttp.TCPConnector(
+            limit=self.max_concurrency,  # 连接池上限与并发数一致
+            ttl_dns_cache=300,  # DNS缓存时间
+            keepalive_timeout=30,  # 空闲连接保持30秒
+            # 有aiodns时使用异步解析器，避免getaddrinfo阻塞事件循环
+            resolver=aiohttp.AsyncResolver() if aiodns else None
+        )
+        
+        # 客户端会话超时设置
+        timeout = aiohttp.ClientTimeout(
+            total=self.request_timeout,
+            connect=min(2.0, self.request_timeout),
+            sock_connect=min(2.0, self.request_timeout),
+            sock_read=self.request_timeout
+        )
+        
+        # 创建客户端会话
+        async with aiohttp.ClientSession(
+            connector=conn,
+            timeout=timeout
+        ) as session:
+            results = []
+            total = len(streams)
+            emit_state = {'last_time': 0.0, 'last_progress': -1}
+            # 流对象 -> 在传入列表中的索引，用于单流完成回调
+            stream_indices = {id(s): i for i, s in enumerate(streams)}
+
+            def _emit_stream(stream):
+                """把单个流的检查结果回调给调用方（通常用于实时刷新UI）"""
+                if self.stream_checked_callback is None:
+                    return
+                idx = stream_indices.get(id(stream), -1)
+                if idx >= 0:
+                    self.stream_checked_callback(idx, stream)
+
+            def _emit_progress():
+                """限频发送进度/状态回调，避免每个流都跨线程触发Qt信号"""
+                done = len(results)
+                progress = int(done / total * 100)
+                now = time.monotonic()
+                # 最多约20Hz，或进度百分比变化时发送；最后一个流必定发送
+                if (progress == emit_state['last_progress']
+                        and now - emit_state['last_time'] < 0.05
+                        and done != total):
+                    return
+                emit_state['last_time'] = now
+                emit_state['last_progress'] = progress
+                if self.progress_callback:
+                    self.progress_callback(progress, done, total)
+                if self.status_callback:
+                    self.status_callback(f"已检查 {done}/{total} 流")
+
+            # 用编译好的正则预过滤格式明显错误的URL，
+            # 它们不值得付出完整的DNS/连接超时成本
+            checkable = []
+            for stream in streams:
+                url = stream.get('url', '')
+                if url and _URL_RE.match(url):
+                    checkable.append(stream)
+                else:
+                    stream['status'] = STATUS_INVALID
+                    stream['resolution'] = 'N/A'
+                    stream['response_time'] = -1
+                    results.append(stream)
+                    _emit_stream(stream)
+
+            # 生产者/消费者模式：按主机分组后放入队列，由固定数量的worker协程消费。
+            # 同一主机的流由同一个worker串行处理，这样keep-alive连接命中率最高，
+            # 并且可以在主机连续失败后快速跳过该主机的剩余源
+            host_buckets = {}
+            for stream in checkable:
+                try:
+                    host = _split_url(stream.get('url', '')).hostname
+                except ValueError:
+                    host = None
+                host_buckets.setdefault(host, []).append(stream)
+
+            # 批量预解析所有唯一主机名并缓存结果
+            await self._preresolve_hosts(host_buckets.keys())
+
+            queue = asyncio.Queue()
+            for host, bucket in host_buckets.items():
+                if host and host in self._dns_cache and self._dns_cache[host] is None:
+                    # DNS解析失败的主机直接标记为无效，不发起任何HTTP请求
+                    for stream in bucket:
+                        stream['status'] = STATUS_INVALID
+                        stream['resolution'] = 'N/A'
+                        stream['response_time'] = -1
+                        results.append(stream)
+                        _emit_stream(stream)
+                    continue
+                queue.put_nowait((host, bucket))
+
+            async def worker():
+                while not self._stop_requested:
+                    try:
+                        host, bucket = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    consecutive_failures = 0
+                    for stream in bucket:
+                        if self._stop_requested:
+                            break
+                        try:
+                            if (self.skip_same_domain_invalid and host
+                                    and consecutive_failures >= 3):
+                                # 该主机已连续多次失败，直接跳过剩余源，不再发起网络请求
+                                stream['status'] = STATUS_SKIPPED
+                                stream['resolution'] = 'N/A'
+                                stream['response_time'] = -1
+                                result = stream
+                            else:
+                                await self._acquire_slot()
+                                try:
+                                    result = await self.check_stream(stream, session)
+                                finally:
+                                    await self._release_slot()
+                                if result.get('status') == STATUS_OK:
+                                    consecutive_failures = 0
+                                else:
+                                    consecutive_failures += 1
+                            results.append(result)
+
+                            # 更新进度和状态（限频），并回调单流结果
+                            if not self._stop_requested:
+                                _emit_stream(result)
+                                _emit_progress()
+
+                        except asyncio.CancelledError:
+                            logger.debug("任务被取消")
+                            raise
+                        except Exception as e:
+                            logger.error("任务错误: {}", e)
+
+            # worker数量即并发上限，不再需要额外的信号量
+            workers = [
+                asyncio.create_task(worker())
+                for _ in range(min(self.max_concurrency, len(host_buckets)))
+            ]
+            for task in workers:
+                self._running_tasks.add(task)
+                task.add_done_callback(self._running_tasks.discard)
+
+            await asyncio.gather(*workers, return_exceptions=True)
+            return results
+    
+    def stop_check(self):
+        """停止检查"""
+        self._stop_requested = True
+
+        # 线程安全地设置停止事件，立即唤醒所有等待中的检测
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+        # 唤醒等待并发名额的协程，让它们看到停止标志后退出
+        self._notify_waiters()
+
+        # 取消所有正在运行的任务（先做快照，done回调会并发地从集合中移除元素）
+        for task in list(self._running_tasks):
+            if not task.done():
+                task.cancel()
+
+        # 关闭线程池并取消尚未开始的检测任务
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.status_callback:
+            self.status_callback("停止流检查...")
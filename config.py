@@ -2,8 +2,31 @@
 import os
 import sys
 import tempfile
+from dataclasses import dataclass, fields, asdict
 from loguru import logger
 import json
+
+try:
+    import orjson  # 序列化比标准库json快数倍，直接产出bytes
+except ImportError:
+    orjson = None
+
+def _dump_json(obj, indent=True):
+    """将对象序列化为UTF-8字节，优先使用orjson
+
+    indent=False产生紧凑输出，适合机器读写的大文件（如流列表）。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=4).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _load_json(data):
+    """从字节/字符串反序列化JSON，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 # 常规应用程序设置
 APP_NAME = "IPTV 检查器"
 APP_VERSION = "1.0.0"
@@ -26,17 +49,48 @@ DEFAULT_THEME = 0  # 默认主题索引：0=深蓝主题, 1=紫罗兰主题, 2=
 LOG_DIR = os.path.join(tempfile.gettempdir(), "iptv-checker")
 CONFIG_FILE = os.path.join(LOG_DIR, "settings.json") # 配置文件路径
 STREAM_LIST_FILE = os.path.join(LOG_DIR, "stream_list.json") # 流列表文件路径
+
+@dataclass(frozen=True)
+class Settings:
+    """用户可配置设置的不可变快照，字段名与配置文件中的键一致"""
+    concurrent_checks: int = CONCURRENT_CHECKS
+    request_timeout: int = REQUEST_TIMEOUT
+    auto_clear_invalid_streams: bool = AUTO_CLEAR_INVALID_STREAMS
+    save_stream_list: bool = SAVE_STREAM_LIST
+    high_concurrency_mode: bool = HIGH_CONCURRENCY_MODE
+    skip_same_domain_invalid: bool = SKIP_SAME_DOMAIN_INVALID
+    default_theme: int = DEFAULT_THEME
+
+# 当前设置快照，由load_settings/save_settings维护
+_SETTINGS = None
+
+def get_settings():
+    """返回当前设置的不可变快照，首次调用时从配置文件加载"""
+    if _SETTINGS is None:
+        load_settings()
+    return _SETTINGS
+
+def _apply_settings(settings):
+    """把设置快照同步到模块级变量（兼容现有的按名导入）"""
+    global CONCURRENT_CHECKS, REQUEST_TIMEOUT, AUTO_CLEAR_INVALID_STREAMS, \
+        SAVE_STREAM_LIST, HIGH_CONCURRENCY_MODE, SKIP_SAME_DOMAIN_INVALID, DEFAULT_THEME
+    CONCURRENT_CHECKS = settings.concurrent_checks
+    REQUEST_TIMEOUT = settings.request_timeout
+    AUTO_CLEAR_INVALID_STREAMS = settings.auto_clear_invalid_streams
+    SAVE_STREAM_LIST = settings.save_stream_list
+    HIGH_CONCURRENCY_MODE = settings.high_concurrency_mode
+    SKIP_SAME_DOMAIN_INVALID = settings.skip_same_domain_invalid
+    DEFAULT_THEME = settings.default_theme
 def setup_logging():
     """设置应用程序日志记录"""
-    # 如果日志目录不存在，则创建它
+    # 一次性创建日志目录，后续的保存不再重复检查
     global LOG_DIR
-    if not os.path.exists(LOG_DIR):
-        try:
-            os.makedirs(LOG_DIR)
-        except Exception as e:
-            print(f"警告：无法创建日志目录: {e}")
-            # 回退到使用当前目录
-            LOG_DIR = "."
+    try:
+        os.makedirs(LOG_DIR, exist_ok=True)
+    except Exception as e:
+        print(f"警告：无法创建日志目录: {e}")
+        # 回退到使用当前目录
+        LOG_DIR = "."
     # 定义日志文件路径
     log_file = os.path.join(LOG_DIR, "iptv_checker.log")
     # 配置日志记录器
@@ -47,7 +101,8 @@ def setup_logging():
         rotation="500 KB",  # 当日志文件达到时进行轮换 500 KB
         retention="10 days",  # 保留日志10天
         compression="zip",  # 压缩旋转日志
-        level="DEBUG"
+        level="DEBUG",
+        enqueue=True  # 日志I/O在后台线程执行，不阻塞调用方
     )
     # 添加控制台处理程序
     logger.add(
@@ -55,87 +110,92 @@ def setup_logging():
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
         level="DEBUG"
     )
-    logger.info(f"已开始 {APP_NAME} v{APP_VERSION}")
-    logger.info(f"日志文件: {log_file}")
-    logger.info(f"使用 {MAX_WORKERS} 工作线程")
+    logger.info("已开始 {} v{}", APP_NAME, APP_VERSION)
+    logger.info("日志文件: {}", log_file)
+    logger.info("使用 {} 工作线程", MAX_WORKERS)
     load_settings() # 加载用户设置
     # Check for OpenCV
     try:
         import cv2
-        logger.info(f"OpenCV已找到且能正常工作 (版本 {cv2.__version__})")
+        logger.info("OpenCV已找到且能正常工作 (版本 {})", cv2.__version__)
     except Exception as e:
-        logger.error(f"OpenCV检查失败: {e}. IPTV检查可能无法正常工作.")
+        logger.error("OpenCV检查失败: {}. IPTV检查可能无法正常工作.", e)
 
 def load_settings():
     """Load settings from config file"""
-    global CONCURRENT_CHECKS, REQUEST_TIMEOUT, AUTO_CLEAR_INVALID_STREAMS, SAVE_STREAM_LIST, HIGH_CONCURRENCY_MODE, SKIP_SAME_DOMAIN_INVALID, DEFAULT_THEME
-    
+    global _SETTINGS
+
     try:
         # Try to load config file
-        with open(CONFIG_FILE, 'r') as f:
-                settings = json.load(f)
-        
-        # Apply settings
-                CONCURRENT_CHECKS = settings.get('concurrent_checks', CONCURRENT_CHECKS)
-                REQUEST_TIMEOUT = settings.get('request_timeout', REQUEST_TIMEOUT)
-                AUTO_CLEAR_INVALID_STREAMS = settings.get('auto_clear_invalid_streams', AUTO_CLEAR_INVALID_STREAMS)
-        SAVE_STREAM_LIST = settings.get('save_stream_list', SAVE_STREAM_LIST)
-        HIGH_CONCURRENCY_MODE = settings.get('high_concurrency_mode', HIGH_CONCURRENCY_MODE)
-        SKIP_SAME_DOMAIN_INVALID = settings.get('skip_same_domain_invalid', SKIP_SAME_DOMAIN_INVALID)
-        DEFAULT_THEME = settings.get('default_theme', DEFAULT_THEME)
-        
+        with open(CONFIG_FILE, 'rb') as f:
+            data = _load_json(f.read())
+
+        # 一次性构建不可变快照，缺失的键使用默认值
+        defaults = Settings()
+        _SETTINGS = Settings(**{
+            f.name: data.get(f.name, getattr(defaults, f.name))
+            for f in fields(Settings)
+        })
+        _apply_settings(_SETTINGS)
+
         logger.debug("配置已从文件加载")
     except FileNotFoundError:
         # Create default config file if not exists
         save_settings()
         logger.debug("配置文件不存在，已创建默认配置文件")
-    except json.JSONDecodeError:
+    except ValueError:
+        # orjson.JSONDecodeError 和 json.JSONDecodeError 都是 ValueError 的子类
         logger.error("配置文件格式错误，使用默认配置")
         # Create default config file
         save_settings()
     except Exception as e:
-        logger.error(f"加载配置时出错: {str(e)}")
+        logger.error("加载配置时出错: {}", e)
 
 def save_settings():
     """Save settings to config file"""
+    global _SETTINGS
     try:
-        settings = {
-            'concurrent_checks': CONCURRENT_CHECKS,
-            'request_timeout': REQUEST_TIMEOUT,
-            'auto_clear_invalid_streams': AUTO_CLEAR_INVALID_STREAMS,
-            'save_stream_list': SAVE_STREAM_LIST,
-            'high_concurrency_mode': HIGH_CONCURRENCY_MODE,
-            'skip_same_domain_invalid': SKIP_SAME_DOMAIN_INVALID,
-            'default_theme': DEFAULT_THEME,
-        }
-        
-        # Ensure config directory exists
-        os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-        
-        # Save settings
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(settings, f, indent=4)
-            
+        # 设置对话框直接修改模块级变量，这里重建快照保证两者一致
+        _SETTINGS = Settings(
+            concurrent_checks=CONCURRENT_CHECKS,
+            request_timeout=REQUEST_TIMEOUT,
+            auto_clear_invalid_streams=AUTO_CLEAR_INVALID_STREAMS,
+            save_stream_list=SAVE_STREAM_LIST,
+            high_concurrency_mode=HIGH_CONCURRENCY_MODE,
+            skip_same_domain_invalid=SKIP_SAME_DOMAIN_INVALID,
+            default_theme=DEFAULT_THEME,
+        )
+
+        # Save settings（目录在setup_logging中已创建）
+        with open(CONFIG_FILE, 'wb') as f:
+            f.write(_dump_json(asdict(_SETTINGS)))
+
         logger.debug("配置已保存到文件")
     except Exception as e:
-        logger.error(f"保存配置时出错: {str(e)}")
+        logger.error("保存配置时出错: {}", e)
+
+def _write_stream_list(streams):
+    """序列化流列表并原子替换目标文件（写临时文件后os.replace）"""
+    try:
+        # 流列表只由程序读写，紧凑格式序列化更快、文件更小
+        data = _dump_json(streams, indent=False)
+        tmp_file = STREAM_LIST_FILE + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        # 原子替换，读取方不会看到写了一半的文件
+        os.replace(tmp_file, STREAM_LIST_FILE)
+        logger.info("已保存 {} 个流到 {}", len(streams), STREAM_LIST_FILE)
+        return True
+    except Exception as e:
+        logger.error("保存流列表到 {} 时发生错误: {}", STREAM_LIST_FILE, e)
+        return False
 
 def save_stream_list(streams):
     """保存流列表到JSON文件"""
     if not SAVE_STREAM_LIST:
         logger.info("流列表保存功能已禁用，不保存列表")
         return False
-    
-    try:
-        if not os.path.exists(LOG_DIR):
-            os.makedirs(LOG_DIR)
-        with open(STREAM_LIST_FILE, 'w', encoding='utf-8') as f:
-            json.dump(streams, f, ensure_ascii=False, indent=4)
-        logger.info(f"已保存 {len(streams)} 个流到 {STREAM_LIST_FILE}")
-        return True
-    except Exception as e:
-        logger.error(f"保存流列表到 {STREAM_LIST_FILE} 时发生错误: {e}")
-        return False
+    return _write_stream_list(streams)
 
 def load_stream_list():
     """从JSON文件加载流列表"""
@@ -144,19 +204,19 @@ def load_stream_list():
         return []
     
     try:
-        if os.path.exists(STREAM_LIST_FILE):
-            with open(STREAM_LIST_FILE, 'r', encoding='utf-8') as f:
-                streams = json.load(f)
-                logger.info(f"从 {STREAM_LIST_FILE} 加载了 {len(streams)} 个流")
-                return streams
-        else:
-            logger.info(f"流列表文件 {STREAM_LIST_FILE} 不存在，返回空列表")
-            return []
-    except json.JSONDecodeError:
-        logger.error(f"解析流列表文件 {STREAM_LIST_FILE} 失败，返回空列表")
+        with open(STREAM_LIST_FILE, 'rb') as f:
+            streams = _load_json(f.read())
+        logger.info("从 {} 加载了 {} 个流", STREAM_LIST_FILE, len(streams))
+        return streams
+    except FileNotFoundError:
+        logger.info("流列表文件 {} 不存在，返回空列表", STREAM_LIST_FILE)
+        return []
+    except ValueError:
+        # orjson.JSONDecodeError 和 json.JSONDecodeError 都是 ValueError 的子类
+        logger.error("解析流列表文件 {} 失败，返回空列表", STREAM_LIST_FILE)
         return []
     except Exception as e:
-        logger.error(f"加载流列表时发生错误: {e}，返回空列表")
+        logger.error("加载流列表时发生错误: {}，返回空列表", e)
         return []
 
 # 在模块加载时尝试加载设置
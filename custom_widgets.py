@@ -1,35 +1,52 @@
 #!/usr/bin/env python3
-from PySide6.QtWidgets import QTableWidgetItem
+from PySide6.QtWidgets import QTableWidgetItem, QStyledItemDelegate
 from PySide6.QtCore import Qt
+from PySide6.QtGui import QPalette
+
+
+class StatusColorDelegate(QStyledItemDelegate):
+    """状态列的绘制委托：按显示文本在绘制时着色
+
+    颜色只在绘制可见行时求值，刷新时不再对每一行调用setForeground。
+    """
+    def __init__(self, colors, parent=None):
+        super().__init__(parent)
+        self._colors = colors  # 状态文本 -> 共享QColor
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        color = self._colors.get(option.text)
+        if color is not None:
+            option.palette.setColor(QPalette.ColorRole.Text, color)
+            option.palette.setColor(QPalette.ColorRole.HighlightedText, color)
 
 class URLTableWidgetItem(QTableWidgetItem):
     """自定义表格项，用于URL单元格的自动缩略显示"""
     def __init__(self, url):
         super().__init__()
+        # URL只保存在full_url（与流字典共享同一str对象），不再setText：
+        # 显示文本全部由data()按需提供，省掉Qt侧的整串QString拷贝
         self.full_url = url
-        self.setText(url)  # 初始设置完整URL
-        
+        self._elide_cache = (None, None)  # (列宽, 缩略后的文本)
+
     def data(self, role):
         """重写data方法以支持自动缩略显示"""
-        if role == Qt.ItemDataRole.DisplayRole:
-            # 获取单元格的宽度
-            if self.tableWidget():
-                column_width = self.tableWidget().columnWidth(self.column())
-                font_metrics = self.tableWidget().fontMetrics()
-                # 计算文本在当前宽度下是否需要缩略
-                text_width = font_metrics.horizontalAdvance(self.full_url)
-                if text_width > column_width - 10:  # 留出一些边距
-                    # 计算可以显示的字符数
-                    visible_length = 0
-                    for i in range(len(self.full_url)):
-                        if font_metrics.horizontalAdvance(self.full_url[:i]) > column_width - 30:  # 为"..."留出空间
-                            visible_length = i - 1
-                            break
-                    if visible_length <= 0:
-                        visible_length = 1  # 至少显示一个字符
-                    # 返回缩略后的文本
-                    return self.full_url[:visible_length] + "..."
-                return self.full_url
+        # 绘制时data会按多种角色反复调用，非显示角色直接走默认行为
+        if role != Qt.ItemDataRole.DisplayRole:
+            return super().data(role)
+        table = self.tableWidget()
+        if table is None:
             return self.full_url
-        # 对于其他角色，使用默认行为
-        return super().data(role) 
\ No newline at end of file
+        column_width = table.columnWidth(self.column())
+        # 稳态快路径：列宽未变时直接复用上次的缩略结果，不再测量字体
+        cached_width, cached_text = self._elide_cache
+        if cached_width == column_width:
+            return cached_text
+        # elidedText在C++层按簇边界二分查找，远快于逐字符测量
+        elided = table.fontMetrics().elidedText(
+            self.full_url,
+            Qt.TextElideMode.ElideRight,
+            max(column_width - 10, 1)  # 留出一些边距
+        )
+        self._elide_cache = (column_width, elided)
+        return elided
\ No newline at end of file
@@ -11,6 +11,7 @@
 import os
 import time
 import json
+import string
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
     QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar, QLabel, 
@@ -19,7 +20,7 @@ from PySide6.QtWidgets import (
     QFormLayout, QCheckBox, QDialogButtonBox, QSpinBox, QComboBox, QTabWidget,
     QStyle
 )
-from PySide6.QtCore import Qt, QUrl, QTimer, QStandardPaths, QSize
+from PySide6.QtCore import Qt, QUrl, QTimer, QStandardPaths, QSize, QThread, QSignalBlocker
 from PySide6.QtGui import QColor, QIcon, QGuiApplication, QAction, QKeySequence, QDesktopServices, QIntValidator, QPalette
 from loguru import logger
 from iptv_checker import IPTVChecker
@@ -32,27 +33,228 @@ from config import (
     SKIP_SAME_DOMAIN_INVALID, DEFAULT_THEME
 )
 from utils import get_url_from_clipboard, is_valid_url, create_temp_directory, clean_temp_directory
-import requests
 from async_iptv_checker import AsyncIPTVChecker
 
 # 导入拆分后的模块
 from stream_formats import parse_m3u, parse_txt
-from custom_widgets import URLTableWidgetItem
-from thread_classes import ImportUrlThread, ImportFileThread, StreamCheckThread
+from custom_widgets import URLTableWidgetItem, StatusColorDelegate
+from thread_classes import ImportUrlThread, ImportFileThread, StreamCheckThread, ExportThread
 from async_checker_runner import AsyncCheckerRunner
 from settings_dialog import SettingsDialog
 
+# QSS模板在模块导入时编译一次，切换主题时只做占位符替换
+_QSS_TEMPLATE = string.Template("""
+          QMainWindow, QDialog { background-color: $bg; color: $text; }
+QWidget { background-color: $bg; color: $text; }
+QGroupBox { border: 1px solid $border; border-radius: 6px; margin-top: 1.5ex; font-weight: bold; color: $text; padding: 2px; }
+QGroupBox::title { subcontrol-origin: margin; subcontrol-position: top center; padding: 0 8px; color: $text; }
+QPushButton { background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 $button_bg, stop:1 $button_bg); color: $text; border: none; border-radius: 6px; padding: 8px 16px; font-weight: bold;  }
+QPushButton:hover { background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 $button_hover, stop:1 $button_hover); }
+QPushButton:pressed { background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 $button_bg, stop:1 $button_hover); }
+QPushButton:disabled { background-color: #444444; color: #888888; }
+QTableWidget { border: 1px solid $border; border-radius: 6px; alternate-background-color: $secondary_bg; gridline-color: $border; color: $text; selection-background-color: $accent; selection-color: $bg; }
+QTableWidget::item { border-bottom: 1px solid $border; padding: 6px; }
+QHeaderView::section { background-color: $header; padding: 6px; border: 1px solid $border; font-weight: bold; color: $text; }
+QProgressBar { border: 1px solid $border; border-radius: 6px; text-align: center; color: $text; background-color: $secondary_bg; height: 20px; }
+QProgressBar::chunk { background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 $progress, stop:1 $accent); border-radius: 5px; }
+QTabWidget::pane { border: 1px solid $border; border-radius: 6px; top: -1px; }
+QTabBar::tab { background-color: $secondary_bg; border: 1px solid $border; border-bottom: none; border-top-left-radius: 6px; border-top-right-radius: 6px; padding: 8px 16px; color: $text; margin-right: 2px; }
+QTabBar::tab:selected { background-color: $bg; border-bottom: 2px solid $accent; }
+QTabBar::tab:hover { background-color: $button_hover; }
+QToolButton { background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 $button_bg, stop:1 $button_bg); color: $text; border: none; border-radius: 6px; padding: 8px 16px; font-weight: bold;  }
+QToolButton:hover { background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 $button_hover, stop:1 $button_hover); }
+QToolButton:pressed { background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 $button_bg, stop:1 $button_hover); }
+QLineEdit, QComboBox, QSpinBox { background-color: $secondary_bg; border: 1px solid $border; border-radius: 6px; padding: 6px; color: $text; }
+QLineEdit:focus, QComboBox:focus, QSpinBox:focus { border: 1px solid $accent; }
+QComboBox::drop-down { border: none; background-color: $accent; border-top-right-radius: 6px; border-bottom-right-radius: 6px; width: 20px; }
+QComboBox::down-arrow { image: url(down_arrow.png); width: 12px; height: 12px; }
+QComboBox QAbstractItemView { background-color: $secondary_bg; border: 1px solid $border; color: $text; selection-background-color: $accent; border-radius: 6px; }
+QCheckBox { color: $text; spacing: 8px; }
+QCheckBox::indicator { width: 18px; height: 18px; border: 2px solid $text; border-radius: 4px; background-color: $secondary_bg; }
+QCheckBox::indicator:checked { background-color: $accent; border-color: $accent; }
+QTextEdit { background-color: $secondary_bg; color: $text; border: 1px solid $border; border-radius: 6px; padding: 6px; }
+QMenu { background-color: $secondary_bg; color: $text; border: 1px solid $border; border-radius: 6px; padding: 4px; }
+QMenu::item { padding: 6px 32px 6px 20px; border-radius: 4px; margin: 2px; }
+QMenu::item:selected { background-color: $accent; color: $bg; }
+QScrollBar:vertical { border: none; background-color: $secondary_bg; width: 12px; margin: 0; }
+QScrollBar::handle:vertical { background-color: $border; border-radius: 6px; min-height: 20px; }
+QScrollBar::handle:vertical:hover { background-color: $accent; }
+QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0px; }
+QScrollBar:horizontal { border: none; background-color: $secondary_bg; height: 12px; margin: 0; }
+QScrollBar::handle:horizontal { background-color: $border; border-radius: 6px; min-width: 20px; }
+QScrollBar::handle:horizontal:hover { background-color: $accent; }
+QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0px; }
+        """)
+
+# 主题配色定义在模块导入时构建一次；全部QSS也随之预渲染，
+# 切换主题的热路径只剩一次元组索引 + setStyleSheet
+_THEMES = (
+    # 深蓝主题
+    {
+        "bg": "#002933", 
+        "secondary_bg": "#002900",
+        "text": "#ffffff",
+        "accent": "#999800",
+        "button_bg": "#0C897D",
+        "button_hover": "#1E534C",
+        "border": "#3386ab",
+        "header": "#156C8C",
+        "progress": "#99ffff",
+        "success": "#00c8ff",
+        "error": "#f44336",
+        "name": "深蓝主题"
+    },
+    # 紫罗兰主题
+    {
+        "bg": "#4a148c",
+        "secondary_bg": "#6a1b9a",
+        "text": "#ffffff",
+        "accent": "#00e5ff",
+        "button_bg": "#7b1fa2",
+        "button_hover": "#9c27b0",
+        "border": "#ba68c8",
+        "header": "#6a1b9a",
+        "progress": "#00e5ff",
+        "success": "#00e676",
+        "error": "#ff1744",
+        "name": "紫罗兰主题"
+    },
+    # 深绿主题
+    {
+        "bg": "#1b5e20",
+        "secondary_bg": "#2e7d32",
+        "text": "#ffffff",
+        "accent": "#ffeb3b",
+        "button_bg": "#388e3c",
+        "button_hover": "#43a047",
+        "border": "#66bb6a",
+        "header": "#2e7d32",
+        "progress": "#ffeb3b",
+        "success": "#76ff03",
+        "error": "#ff5722",
+        "name": "深绿主题"
+    },
+    # 暗橙主题
+    {
+        "bg": "#bf360c",
+        "secondary_bg": "#d84315",
+        "text": "#ffffff",
+        "accent": "#00bcd4",
+        "button_bg": "#e64a19",
+        "button_hover": "#f4511e",
+        "border": "#ff5722",
+        "header": "#d84315",
+        "progress": "#00bcd4",
+        "success": "#64dd17",
+        "error": "#d50000",
+        "name": "暗橙主题"
+    },
+    # 深灰主题
+    {
+        "bg": "#212121",
+        "secondary_bg": "#424242",
+        "text": "#f5f5f5",
+        "accent": "#03a9f4",
+        "button_bg": "#616161",
+        "button_hover": "#757575",
+        "border": "#9e9e9e",
+        "header": "#424242",
+        "progress": "#03a9f4",
+        "success": "#00e676",
+        "error": "#f44336",
+        "name": "深灰主题"
+    }
+)
+
+_RENDERED_SHEETS = tuple(_QSS_TEMPLATE.safe_substitute(t) for t in _THEMES)
+
+# 状态 -> 前景色的共享QColor实例，所有行复用同一对象而不是逐单元格构造
+_STATUS_COLORS = {
+    '正常': QColor(0, 200, 0),      # 绿色
+    '无效源': QColor(255, 0, 0),    # 红色
+    '错误': QColor(255, 0, 0),      # 红色
+    '未检测': QColor(128, 128, 128), # 灰色
+}
+
+# 筛选用的整数编码表：状态文本/筛选项 -> 编码，0表示不匹配任何筛选项
+_STATUS_FILTER_CODES = {'正常': 1, '错误': 2, '未检测': 3}
+_RES_FILTER_CODES = {'SD': 1, 'HD': 2, 'FHD': 3, '4K': 4}
+
+def _annotate_filter_codes(stream):
+    """在流字典上预计算筛选用的整数编码
+
+    apply_filters在每次下拉框变化时对全部流求值，预先把状态/分辨率/
+    响应时间折算成整数后，筛选只剩每行三次整数比较。
+    """
+    stream['_status_code'] = _STATUS_FILTER_CODES.get(stream.get('status', ''), 0)
+    res = str(stream.get('resolution', '')).lower()
+    if '4k' in res:
+        res_code = 4
+    elif '1080' in res or 'fhd' in res:
+        res_code = 3
+    elif '720' in res or 'hd' in res:
+        res_code = 2
+    elif '480' in res or '576' in res or 'sd' in res:
+        res_code = 1
+    else:
+        res_code = 0
+    stream['_res_code'] = res_code
+    try:
+        stream['_rt_ms'] = int(stream.get('response_time', 999999))
+    except (TypeError, ValueError):
+        stream['_rt_ms'] = 999999
+
 class IPTVCheckerGUI(QMainWindow):
     """IPTV流检查器应用程序的主窗口"""
+    # 图标注册表：同名图标只探测一次主题目录，之后复用同一QIcon句柄
+    _ICON_CACHE = {}
+    # 主题图标缺失时的QStyle标准图标回退
+    _ICON_FALLBACKS = {
+        "preferences-system": QStyle.StandardPixmap.SP_FileDialogDetailedView,
+        "preferences-desktop-theme": QStyle.StandardPixmap.SP_DesktopIcon,
+    }
+
+    @classmethod
+    def _icon(cls, name):
+        """按名称获取缓存的主题图标，必要时使用标准图标回退"""
+        icon = cls._ICON_CACHE.get(name)
+        if icon is None:
+            icon = QIcon.fromTheme(name)
+            if icon.isNull() and name in cls._ICON_FALLBACKS:
+                icon = QApplication.style().standardIcon(cls._ICON_FALLBACKS[name])
+            cls._ICON_CACHE[name] = icon
+        return icon
+
     def __init__(self):
         super().__init__()
         self.checker = IPTVChecker()
         self.import_thread = None # 用于URL导入的线程实例
+        self.export_thread = None # 用于文件导出的线程实例
+        self._last_detail_selection = frozenset() # 上次详情面板对应的选中行集合
+        self._detail_timer = QTimer(self) # 选择变化去抖后刷新详情面板
+        self._detail_timer.setSingleShot(True)
+        self._detail_timer.timeout.connect(self._do_update_details)
         self.check_thread = None
+        self.async_checker = None # 异步检查器实例
+        self.async_runner = None # 异步检查器的Qt包装
+        self.async_thread = None # 承载异步事件循环的线程
         self.streams = []
         self.clipboard_timer = None
         self.last_clipboard_content = None
         self._is_updating_from_code = False # 添加标志以防止递归更新
+        self._pending_updates = {} # 待刷新的检测结果缓冲区：索引 -> 流信息
+        self._table_source = None # 当前正在填充表格的流列表（用于取消被取代的分批填充）
+        self._url_to_row = None # URL -> 表格行号映射，None表示需要重建
+        self._url_set = set() # 列表中已有的URL集合，导入时O(1)去重
+        self._streams_dirty = False # 流列表自上次保存后是否有变化
+        from collections import deque
+        self._log_buffer = deque(maxlen=256) # 待写入日志视图的消息缓冲区
+        self._log_flush_timer = QTimer(self) # 100ms批量刷新日志，避免逐条重排文档
+        self._log_flush_timer.setInterval(100)
+        self._log_flush_timer.timeout.connect(self._flush_log_messages)
+        self._flush_timer = QTimer(self) # 约30Hz批量刷新检测结果到表格
+        self._flush_timer.setInterval(33)
+        self._flush_timer.timeout.connect(self._flush_stream_updates)
         self.temp_directory = create_temp_directory() # 创建临时目录并存储路径
         self.is_checking = False # 检测状态标志
         
@@ -68,8 +270,8 @@ class IPTVCheckerGUI(QMainWindow):
         # 启用拖放功能
         self.setAcceptDrops(True)
         
-        # 启动时加载之前的流列表
-        self.load_stream_list_on_startup()
+        # 启动时加载之前的流列表（推迟到事件循环，首帧绘制不被磁盘I/O阻塞）
+        QTimer.singleShot(0, self.load_stream_list_on_startup)
     
     def apply_settings_changes(self):
         """应用通过设置对话框更改的设置"""
@@ -95,13 +297,26 @@ class IPTVCheckerGUI(QMainWindow):
             if not silent:
                 QMessageBox.information(self, "信息", "列表中没有流可清除。")
             return
-        initial_count = len(self.streams)
-        # 过滤掉无效的流 ('无效源', '错误', 或者任何非 '正常' 的状态)
+        # 找出无效流的索引 ('无效源', '错误', 或者任何非 '正常' 的状态)
         # 我们需要更精确地定义什么是"无效"。通常是 '无效源' 或包含 '错误' 的状态。
-        valid_streams = [s for s in self.streams if s.get('status', '').lower() == '正常']
-        num_removed = initial_count - len(valid_streams)
+        # 状态取值全是中文常量，直接比较即可，无需逐行lower()
+        bad = [i for i, s in enumerate(self.streams) if s.get('status', '') != '正常']
+        num_removed = len(bad)
         if num_removed > 0:
-            self.streams = valid_streams
+            # 合并为连续区间后倒序切片删除，原地收缩列表而不是整表复制
+            runs = []
+            start = prev = bad[0]
+            for i in bad[1:]:
+                if i == prev + 1:
+                    prev = i
+                else:
+                    runs.append((start, prev))
+                    start = prev = i
+            runs.append((start, prev))
+            for run_start, run_end in reversed(runs):
+                del self.streams[run_start:run_end + 1]
+            self._rebuild_url_set()
+            self._streams_dirty = True
             self.update_table(self.streams) # 假设 self.streams 是表格的数据源
             if not silent:
                 QMessageBox.information(self, "操作完成", f"已移除 {num_removed} 个无效源。")
@@ -144,7 +359,7 @@ class IPTVCheckerGUI(QMainWindow):
         file_group = QGroupBox("文件操作")
         file_layout = QHBoxLayout(file_group)
         self.import_button = QPushButton("导入流")
-        self.import_button.setIcon(QIcon.fromTheme("document-open"))
+        self.import_button.setIcon(self._icon("document-open"))
         self.import_button.setToolTip("导入IPTV流文件，支持M3U和TXT格式")
         self.import_button.clicked.connect(self.open_import_dialog)
         file_layout.addWidget(self.import_button)
@@ -152,35 +367,28 @@ class IPTVCheckerGUI(QMainWindow):
         # 添加带有下拉菜单的剪贴板按钮
         self.clipboard_button = QToolButton()
         self.clipboard_button.setText("剪贴板")
-        self.clipboard_button.setIcon(QIcon.fromTheme("edit-paste"))
+        self.clipboard_button.setIcon(self._icon("edit-paste"))
         self.clipboard_button.setToolTip("从剪贴板导入URL (Ctrl+V)")
         self.clipboard_button.clicked.connect(self.import_from_clipboard)
         file_layout.addWidget(self.clipboard_button)
         self.export_m3u_button = QPushButton("导出 M3U")
-        self.export_m3u_button.setIcon(QIcon.fromTheme("document-save"))
+        self.export_m3u_button.setIcon(self._icon("document-save"))
         self.export_m3u_button.clicked.connect(lambda: self.export_streams("m3u"))
         file_layout.addWidget(self.export_m3u_button)
         self.export_txt_button = QPushButton("导出 TXT")
-        self.export_txt_button.setIcon(QIcon.fromTheme("document-save-as"))
+        self.export_txt_button.setIcon(self._icon("document-save-as"))
         self.export_txt_button.clicked.connect(lambda: self.export_streams("txt"))
         file_layout.addWidget(self.export_txt_button)
         controls_layout.addWidget(file_group)
         # 设置按钮
         self.settings_button = QToolButton()
-        self.settings_button.setIcon(QIcon.fromTheme("preferences-system")) # 使用系统主题图标
-        if self.settings_button.icon().isNull(): # 如果主题图标不可用，尝试备用图标
-            # 在Windows上，可以尝试使用QStyle的标准图标
-            style = QApplication.style()
-            self.settings_button.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_FileDialogDetailedView))
+        self.settings_button.setIcon(self._icon("preferences-system")) # 使用系统主题图标（含标准图标回退）
         self.settings_button.setToolTip("打开设置")
         self.settings_button.clicked.connect(self.open_settings_dialog)
         
         # 添加主题切换按钮
         self.theme_button = QToolButton()
-        self.theme_button.setIcon(QIcon.fromTheme("preferences-desktop-theme"))
-        if self.theme_button.icon().isNull():
-            style = QApplication.style()
-            self.theme_button.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_DesktopIcon))
+        self.theme_button.setIcon(self._icon("preferences-desktop-theme"))
         self.theme_button.setToolTip("切换主题")
         self.theme_button.clicked.connect(self.switch_theme)
         
@@ -202,7 +410,7 @@ class IPTVCheckerGUI(QMainWindow):
         self.progress_layout.addWidget(self.import_progress_bar)
 
         self.cancel_import_button = QPushButton("取消导入")
-        self.cancel_import_button.setIcon(QIcon.fromTheme("process-stop"))
+        self.cancel_import_button.setIcon(self._icon("process-stop"))
         self.cancel_import_button.setVisible(False) # 初始隐藏
         self.cancel_import_button.clicked.connect(self.cancel_current_import)
         self.progress_layout.addWidget(self.cancel_import_button)
@@ -212,15 +420,15 @@ class IPTVCheckerGUI(QMainWindow):
         check_group = QGroupBox("检测操作")
         check_layout = QHBoxLayout(check_group)
         self.check_button = QPushButton("检测所有流")
-        self.check_button.setIcon(QIcon.fromTheme("view-refresh"))
+        self.check_button.setIcon(self._icon("view-refresh"))
         self.check_button.clicked.connect(self.check_streams)
         check_layout.addWidget(self.check_button)
         self.check_selected_button = QPushButton("检测选中项")
-        self.check_selected_button.setIcon(QIcon.fromTheme("view-filter"))
+        self.check_selected_button.setIcon(self._icon("view-filter"))
         self.check_selected_button.clicked.connect(self.check_selected_streams)
         check_layout.addWidget(self.check_selected_button)
         self.stop_button = QPushButton("停止检测")
-        self.stop_button.setIcon(QIcon.fromTheme("process-stop"))
+        self.stop_button.setIcon(self._icon("process-stop"))
         self.stop_button.clicked.connect(self.stop_checking)
         self.stop_button.setEnabled(False)
         check_layout.addWidget(self.stop_button)
@@ -228,7 +436,7 @@ class IPTVCheckerGUI(QMainWindow):
         self.auto_clear_invalid_checkbox.setToolTip("检测期间自动去掉URL无效的数据")
         check_layout.addWidget(self.auto_clear_invalid_checkbox)
         self.clear_invalid_button = QPushButton("清除无效源")
-        self.clear_invalid_button.setIcon(QIcon.fromTheme("edit-delete"))
+        self.clear_invalid_button.setIcon(self._icon("edit-delete"))
         self.clear_invalid_button.clicked.connect(self.clear_invalid_button_clicked)
 
         check_layout.addWidget(self.clear_invalid_button)
@@ -280,6 +488,8 @@ class IPTVCheckerGUI(QMainWindow):
         # Log display
         self.log_display = QTextEdit()
         self.log_display.setReadOnly(True)
+        # 环形缓冲：超过2000条后QTextDocument自动丢弃最旧的块，内存恒定
+        self.log_display.document().setMaximumBlockCount(2000)
         status_layout.addWidget(self.log_display)
         tabs.addTab(status_widget, "状态 & 日志")
         # 流详情选项卡
@@ -298,9 +508,20 @@ class IPTVCheckerGUI(QMainWindow):
         self.add_log_message("应用已启动")
 
     def add_log_message(self, message):
-        """在日志显示中添加一条消息"""
+        """在日志显示中添加一条消息（先入缓冲区，定时批量写入）"""
         timestamp = time.strftime("%H:%M:%S")
-        self.log_display.append(f"[{timestamp}] {message}")
+        self._log_buffer.append(f"[{timestamp}] {message}")
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+
+    def _flush_log_messages(self):
+        """把缓冲的日志一次性追加到日志视图，每批只触发一次重排"""
+        if not self._log_buffer:
+            self._log_flush_timer.stop()
+            return
+        messages = '\n'.join(self._log_buffer)
+        self._log_buffer.clear()
+        self.log_display.append(messages)
 
     def update_status_bar(self, message):
         """更新状态栏显示的消息（兼容旧代码）"""
@@ -334,19 +555,26 @@ class IPTVCheckerGUI(QMainWindow):
         self.stream_table.setHorizontalHeaderLabels([
             "选择", "      名称      ", "URL", "分类", "归属地", "分辨率", "响应时间 (毫秒)", "状态"
         ])
-        # 配置表格外观
+        # 配置表格外观：除URL列自动拉伸外全部使用固定/可拖动宽度，
+        # ResizeToContents会在每次数据变化时测量整列单元格（O(N)布局）
         header = self.stream_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # 选择
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)  # 选择
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Interactive)  # Name - 可调整但不自动拉伸
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)  # URL - 自动拉伸占用更多空间
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # 分类
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # 归属地
-        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # 分辨率
-        header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # 响应时间
-        header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)  # 状态
-        
-        # 设置列宽度
-        self.stream_table.setColumnWidth(1, 100)  # 名称列宽度设为150像素
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Interactive)  # 分类
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.Interactive)  # 归属地
+        header.setSectionResizeMode(5, QHeaderView.ResizeMode.Interactive)  # 分辨率
+        header.setSectionResizeMode(6, QHeaderView.ResizeMode.Interactive)  # 响应时间
+        header.setSectionResizeMode(7, QHeaderView.ResizeMode.Interactive)  # 状态
+
+        # 设置列宽度（一次设定，刷新时不再按内容测量）
+        self.stream_table.setColumnWidth(0, 50)   # 选择
+        self.stream_table.setColumnWidth(1, 100)  # 名称
+        self.stream_table.setColumnWidth(3, 100)  # 分类
+        self.stream_table.setColumnWidth(4, 110)  # 归属地
+        self.stream_table.setColumnWidth(5, 90)   # 分辨率
+        self.stream_table.setColumnWidth(6, 120)  # 响应时间
+        self.stream_table.setColumnWidth(7, 90)   # 状态
         # 启用双击编辑功能，但仅限于名称列
         self.stream_table.setEditTriggers(QTableWidget.EditTrigger.DoubleClicked)
         # 添加双击事件处理
@@ -355,15 +583,21 @@ class IPTVCheckerGUI(QMainWindow):
         self.stream_table.itemChanged.connect(self.handle_item_changed)
         # 启用排序
         self.stream_table.setSortingEnabled(True)
+        # 用户排序会重排行号，作废URL->行号映射
+        self.stream_table.horizontalHeader().sortIndicatorChanged.connect(self._invalidate_url_row_map)
+        # 状态列颜色在绘制时按文本取色，不再逐行setForeground
+        self.stream_table.setItemDelegateForColumn(7, StatusColorDelegate(_STATUS_COLORS, self.stream_table))
         # 启用多项选择
         self.stream_table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
+        # 按整行选择：selectedRows()每行只产生一个索引，
+        # 选中行的提取不再随列数放大（也免去set去重）
+        self.stream_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         # 连接选择更改信号
         self.stream_table.itemSelectionChanged.connect(self.update_stream_details)
         # 启用隔行背景色
         self.stream_table.setAlternatingRowColors(True)
         # 设置表格大小调整时自动调整列宽
         self.stream_table.horizontalHeader().setStretchLastSection(False)
-        self.stream_table.resizeColumnsToContents()
         
         # 禁用右键菜单自动弹出，改为使用菜单键或F10触发
         self.stream_table.setContextMenuPolicy(Qt.ContextMenuPolicy.DefaultContextMenu)
@@ -392,18 +626,18 @@ class IPTVCheckerGUI(QMainWindow):
             QMessageBox.information(self, "剪贴板导入", "剪贴板中未检测到内容。")
             return
             
-        # 检查剪贴板内容是否包含URL或是有效的M3U/TXT格式
-        from utils import is_valid_url
-        
-        # 检查是否是URL或包含URL
-        contains_url = False
-        lines = clipboard_content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if is_valid_url(line) or 'http://' in line or 'https://' in line:
-                contains_url = True
-                break
-                
+        # 快速路径：开头就是#EXTM3U的M3U内容或头部带#genre#的TXT内容
+        # 必然有效，O(1)判断即可跳过对整块文本的URL扫描
+        head = clipboard_content[:64].lstrip()[:16]
+        if head.startswith('#EXTM3U') or '#genre#' in clipboard_content[:1024]:
+            self.import_url_from_clipboard(clipboard_content)
+            return
+
+        # 检查剪贴板内容是否包含URL：对整块文本做一次预编译正则扫描，
+        # 避免对几千行的M3U逐行strip+子串判断
+        from utils import URL_PREFIX_RE
+        contains_url = bool(URL_PREFIX_RE.search(clipboard_content))
+
         if not contains_url:
             QMessageBox.information(self, "剪贴板导入", "剪贴板内容不包含有效的URL或流数据。\n请确保内容包含http://或https://开头的链接。")
             return
@@ -441,139 +675,16 @@ class IPTVCheckerGUI(QMainWindow):
         
     def apply_stylesheet(self):
         """应用自定义样式表以改善用户界面外观"""
-        # 随机选择一个主题颜色方案
-        import random
-        
-        # 定义几种不同的主题配色
-        themes = [
-            # 深蓝主题
-            {
-                "bg": "#002933", 
-                "secondary_bg": "#002900",
-                "text": "#ffffff",
-                "accent": "#999800",
-                "button_bg": "#0C897D",
-                "button_hover": "#1E534C",
-                "border": "#3386ab",
-                "header": "#156C8C",
-                "progress": "#99ffff",
-                "success": "#00c8ff",
-                "error": "#f44336",
-                "name": "深蓝主题"
-            },
-            # 紫罗兰主题
-            {
-                "bg": "#4a148c",
-                "secondary_bg": "#6a1b9a",
-                "text": "#ffffff",
-                "accent": "#00e5ff",
-                "button_bg": "#7b1fa2",
-                "button_hover": "#9c27b0",
-                "border": "#ba68c8",
-                "header": "#6a1b9a",
-                "progress": "#00e5ff",
-                "success": "#00e676",
-                "error": "#ff1744",
-                "name": "紫罗兰主题"
-            },
-            # 深绿主题
-            {
-                "bg": "#1b5e20",
-                "secondary_bg": "#2e7d32",
-                "text": "#ffffff",
-                "accent": "#ffeb3b",
-                "button_bg": "#388e3c",
-                "button_hover": "#43a047",
-                "border": "#66bb6a",
-                "header": "#2e7d32",
-                "progress": "#ffeb3b",
-                "success": "#76ff03",
-                "error": "#ff5722",
-                "name": "深绿主题"
-            },
-            # 暗橙主题
-            {
-                "bg": "#bf360c",
-                "secondary_bg": "#d84315",
-                "text": "#ffffff",
-                "accent": "#00bcd4",
-                "button_bg": "#e64a19",
-                "button_hover": "#f4511e",
-                "border": "#ff5722",
-                "header": "#d84315",
-                "progress": "#00bcd4",
-                "success": "#64dd17",
-                "error": "#d50000",
-                "name": "暗橙主题"
-            },
-            # 深灰主题
-            {
-                "bg": "#212121",
-                "secondary_bg": "#424242",
-                "text": "#f5f5f5",
-                "accent": "#03a9f4",
-                "button_bg": "#616161",
-                "button_hover": "#757575",
-                "border": "#9e9e9e",
-                "header": "#424242",
-                "progress": "#03a9f4",
-                "success": "#00e676",
-                "error": "#f44336",
-                "name": "深灰主题"
-            }
-        ]
         
         # 如果已经有当前主题索引，则使用下一个主题，否则使用默认主题
         if hasattr(self, 'current_theme_index'):
-            self.current_theme_index = (self.current_theme_index + 1) % len(themes)
-            theme = themes[self.current_theme_index]
+            self.current_theme_index = (self.current_theme_index + 1) % len(_THEMES)
         else:
             self.current_theme_index = DEFAULT_THEME
-            theme = themes[self.current_theme_index]
-        
-        # 应用选择的主题
-        self.setStyleSheet(f"""
-          QMainWindow, QDialog {{ background-color: {theme["bg"]}; color: {theme["text"]}; }}
-QWidget {{ background-color: {theme["bg"]}; color: {theme["text"]}; }}
-QGroupBox {{ border: 1px solid {theme["border"]}; border-radius: 6px; margin-top: 1.5ex; font-weight: bold; color: {theme["text"]}; padding: 2px; }}
-QGroupBox::title {{ subcontrol-origin: margin; subcontrol-position: top center; padding: 0 8px; color: {theme["text"]}; }}
-QPushButton {{ background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {theme["button_bg"]}, stop:1 {theme["button_bg"]}); color: {theme["text"]}; border: none; border-radius: 6px; padding: 8px 16px; font-weight: bold;  }}
-QPushButton:hover {{ background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {theme["button_hover"]}, stop:1 {theme["button_hover"]}); }}
-QPushButton:pressed {{ background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {theme["button_bg"]}, stop:1 {theme["button_hover"]}); }}
-QPushButton:disabled {{ background-color: #444444; color: #888888; }}
-QTableWidget {{ border: 1px solid {theme["border"]}; border-radius: 6px; alternate-background-color: {theme["secondary_bg"]}; gridline-color: {theme["border"]}; color: {theme["text"]}; selection-background-color: {theme["accent"]}; selection-color: {theme["bg"]}; }}
-QTableWidget::item {{ border-bottom: 1px solid {theme["border"]}; padding: 6px; }}
-QHeaderView::section {{ background-color: {theme["header"]}; padding: 6px; border: 1px solid {theme["border"]}; font-weight: bold; color: {theme["text"]}; }}
-QProgressBar {{ border: 1px solid {theme["border"]}; border-radius: 6px; text-align: center; color: {theme["text"]}; background-color: {theme["secondary_bg"]}; height: 20px; }}
-QProgressBar::chunk {{ background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {theme["progress"]}, stop:1 {theme["accent"]}); border-radius: 5px; }}
-QTabWidget::pane {{ border: 1px solid {theme["border"]}; border-radius: 6px; top: -1px; }}
-QTabBar::tab {{ background-color: {theme["secondary_bg"]}; border: 1px solid {theme["border"]}; border-bottom: none; border-top-left-radius: 6px; border-top-right-radius: 6px; padding: 8px 16px; color: {theme["text"]}; margin-right: 2px; }}
-QTabBar::tab:selected {{ background-color: {theme["bg"]}; border-bottom: 2px solid {theme["accent"]}; }}
-QTabBar::tab:hover {{ background-color: {theme["button_hover"]}; }}
-QToolButton {{ background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {theme["button_bg"]}, stop:1 {theme["button_bg"]}); color: {theme["text"]}; border: none; border-radius: 6px; padding: 8px 16px; font-weight: bold;  }}
-QToolButton:hover {{ background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {theme["button_hover"]}, stop:1 {theme["button_hover"]}); }}
-QToolButton:pressed {{ background-color: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 {theme["button_bg"]}, stop:1 {theme["button_hover"]}); }}
-QLineEdit, QComboBox, QSpinBox {{ background-color: {theme["secondary_bg"]}; border: 1px solid {theme["border"]}; border-radius: 6px; padding: 6px; color: {theme["text"]}; }}
-QLineEdit:focus, QComboBox:focus, QSpinBox:focus {{ border: 1px solid {theme["accent"]}; }}
-QComboBox::drop-down {{ border: none; background-color: {theme["accent"]}; border-top-right-radius: 6px; border-bottom-right-radius: 6px; width: 20px; }}
-QComboBox::down-arrow {{ image: url(down_arrow.png); width: 12px; height: 12px; }}
-QComboBox QAbstractItemView {{ background-color: {theme["secondary_bg"]}; border: 1px solid {theme["border"]}; color: {theme["text"]}; selection-background-color: {theme["accent"]}; border-radius: 6px; }}
-QCheckBox {{ color: {theme["text"]}; spacing: 8px; }}
-QCheckBox::indicator {{ width: 18px; height: 18px; border: 2px solid {theme["text"]}; border-radius: 4px; background-color: {theme["secondary_bg"]}; }}
-QCheckBox::indicator:checked {{ background-color: {theme["accent"]}; border-color: {theme["accent"]}; }}
-QTextEdit {{ background-color: {theme["secondary_bg"]}; color: {theme["text"]}; border: 1px solid {theme["border"]}; border-radius: 6px; padding: 6px; }}
-QMenu {{ background-color: {theme["secondary_bg"]}; color: {theme["text"]}; border: 1px solid {theme["border"]}; border-radius: 6px; padding: 4px; }}
-QMenu::item {{ padding: 6px 32px 6px 20px; border-radius: 4px; margin: 2px; }}
-QMenu::item:selected {{ background-color: {theme["accent"]}; color: {theme["bg"]}; }}
-QScrollBar:vertical {{ border: none; background-color: {theme["secondary_bg"]}; width: 12px; margin: 0; }}
-QScrollBar::handle:vertical {{ background-color: {theme["border"]}; border-radius: 6px; min-height: 20px; }}
-QScrollBar::handle:vertical:hover {{ background-color: {theme["accent"]}; }}
-QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{ height: 0px; }}
-QScrollBar:horizontal {{ border: none; background-color: {theme["secondary_bg"]}; height: 12px; margin: 0; }}
-QScrollBar::handle:horizontal {{ background-color: {theme["border"]}; border-radius: 6px; min-width: 20px; }}
-QScrollBar::handle:horizontal:hover {{ background-color: {theme["accent"]}; }}
-QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px; }}
-        """)
+        theme = _THEMES[self.current_theme_index]
+
+        # 应用选择的主题（样式表在模块导入时已全部渲染好）
+        self.setStyleSheet(_RENDERED_SHEETS[self.current_theme_index])
         
         # 记录当前使用的主题
         logger.info(f"应用了主题: {theme['name']}")
@@ -650,14 +761,25 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
             self.update_status_bar("导入完成，但未找到流。")
             return
         
-        # 将新流添加到现有流列表中
-        current_stream_count = len(self.streams)
-        self.streams.extend(streams)
-        
+        # 将新流添加到现有流列表中，列表里已有的URL直接跳过，
+        # 后续的表格刷新/筛选/检测都不必为重复条目买单
+        new_streams = []
+        for s in streams:
+            url = s.get('url')
+            if url and url not in self._url_set:
+                self._url_set.add(url)
+                new_streams.append(s)
+        skipped = len(streams) - len(new_streams)
+        self.streams.extend(new_streams)
+        if new_streams:
+            self._streams_dirty = True
+
         # 更新表格
         self.update_table(self.streams)
-        
-        success_msg = f"成功导入 {len(streams)} 个流。"
+
+        success_msg = f"成功导入 {len(new_streams)} 个流。"
+        if skipped:
+            success_msg += f"（跳过 {skipped} 个重复项）"
         logger.info(success_msg)
         self.update_status_bar(success_msg)
         
@@ -665,67 +787,121 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         """响应清除无效源按钮的点击事件"""
         self.clear_invalid_streams()
             
-    def update_table(self, streams):
-        """使用流媒体数据更新表格"""
-        self._is_updating_from_code = True  # 设置标志以防止递归触发
-        self.stream_table.setSortingEnabled(False)  # 临时禁用排序
-        self.stream_table.setRowCount(len(streams))
-        
-        for row, stream in enumerate(streams):
-            # 选择列 - 添加复选框
+    def _set_table_cell(self, row, column, text):
+        """设置单元格文本，已有的QTableWidgetItem就地复用以避免重复分配"""
+        item = self.stream_table.item(row, column)
+        if item is None:
+            item = QTableWidgetItem(text)
+            self.stream_table.setItem(row, column, item)
+        elif item.text() != text:
+            item.setText(text)
+        return item
+
+    def _fill_table_row(self, row, stream):
+        """填充表格中的一行，尽量复用已有的表格项"""
+        # 进入表格的流保证带有筛选编码（导入/加载路径都经过这里）
+        if '_status_code' not in stream:
+            _annotate_filter_codes(stream)
+
+        # 热路径局部预绑定：循环中反复访问的方法/枚举降为LOAD_FAST
+        table_item = self.stream_table.item
+        set_cell = self._set_table_cell
+        stream_get = stream.get
+
+        # 选择列 - 添加复选框（已存在时保留原勾选状态对象，重置为未选）
+        checkbox = table_item(row, 0)
+        if checkbox is None:
             checkbox = QTableWidgetItem()
             checkbox.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-            checkbox.setCheckState(Qt.CheckState.Unchecked)
             self.stream_table.setItem(row, 0, checkbox)
-            
-            # 名称列
-            name_item = QTableWidgetItem(stream.get('name', '未知'))
-            self.stream_table.setItem(row, 1, name_item)
-            
-            # URL列 - 使用自定义的可缩略显示的TableItem
-            url = stream.get('url', '')
-            url_item = URLTableWidgetItem(url)  # 自定义的TableWidgetItem
-            self.stream_table.setItem(row, 2, url_item)
-            
-            # 分类
-            group_item = QTableWidgetItem(stream.get('group', ''))
-            self.stream_table.setItem(row, 3, group_item)
-            
-            # 归属地
-            country_item = QTableWidgetItem(stream.get('country', ''))
-            self.stream_table.setItem(row, 4, country_item)
-            
-            # 分辨率
-            resolution_item = QTableWidgetItem(stream.get('resolution', ''))
-            self.stream_table.setItem(row, 5, resolution_item)
-            
-            # 响应时间
-            response_time = stream.get('response_time', '')
-            if response_time:
-                response_time_item = QTableWidgetItem(str(response_time))
-                response_time_item.setData(Qt.ItemDataRole.DisplayRole, response_time) # 设置为数值以便正确排序
-            else:
-                response_time_item = QTableWidgetItem('')
-            self.stream_table.setItem(row, 6, response_time_item)
-            
-            # 状态
-            status_item = QTableWidgetItem(stream.get('status', '未检测'))
-            # 根据状态设置颜色
-            status = stream.get('status', '').lower()
-            if status == '正常':
-                status_item.setForeground(QColor(0, 200, 0))  # 绿色
-            elif status in ['无效源', '错误']:
-                status_item.setForeground(QColor(255, 0, 0))  # 红色
-            elif status == '未检测':
-                status_item.setForeground(QColor(128, 128, 128)) # 灰色
-            self.stream_table.setItem(row, 7, status_item)
-        
-        self.stream_table.setSortingEnabled(True)  # 重新启用排序
-        self._is_updating_from_code = False  # 重置标志
-        
-        # 调整列宽以适应内容
-        self.stream_table.resizeColumnsToContents()
-        
+        checkbox.setCheckState(Qt.CheckState.Unchecked)
+
+        # 名称列
+        set_cell(row, 1, stream_get('name', '未知'))
+
+        # URL列 - 使用自定义的可缩略显示的TableItem，已有项只更新URL
+        url = stream_get('url', '')
+        url_item = table_item(row, 2)
+        if isinstance(url_item, URLTableWidgetItem):
+            if url_item.full_url != url:
+                url_item.full_url = url
+                url_item._elide_cache = (None, None)
+        else:
+            self.stream_table.setItem(row, 2, URLTableWidgetItem(url))
+
+        # 分类
+        set_cell(row, 3, stream_get('group', ''))
+
+        # 归属地
+        set_cell(row, 4, stream_get('country', ''))
+
+        # 分辨率
+        set_cell(row, 5, stream_get('resolution', ''))
+
+        # 响应时间
+        response_time = stream_get('response_time', '')
+        response_time_item = set_cell(row, 6, str(response_time) if response_time else '')
+        if response_time:
+            response_time_item.setData(Qt.ItemDataRole.DisplayRole, response_time) # 设置为数值以便正确排序
+
+        # 状态（颜色由状态列的绘制委托在绘制时决定）
+        set_cell(row, 7, stream_get('status', '未检测'))
+
+    def _rebuild_url_set(self):
+        """按当前流列表重建URL去重集合"""
+        self._url_set = {s['url'] for s in self.streams if s.get('url')}
+
+    def _invalidate_url_row_map(self, *args):
+        """表格行序或内容变化后作废URL->行号映射，下次查找时再重建"""
+        self._url_to_row = None
+
+    def _rebuild_url_row_map(self):
+        """按当前表格行序重建URL->行号映射（一次O(N)，之后查找O(1)）"""
+        self._url_to_row = {}
+        for row in range(self.stream_table.rowCount()):
+            item = self.stream_table.item(row, 2)
+            if item is not None and hasattr(item, 'full_url'):
+                self._url_to_row[item.full_url] = row
+
+    def _bulk_table_update(self, fill_func, restore_sorting=True):
+        """在关闭排序、信号和重绘的前提下执行批量表格填充
+
+        QSignalBlocker挡掉每次setItem触发的itemChanged/selectionChanged槽，
+        排序关闭避免填充期间的O(N log N)重排，结束后全部恢复。
+        分批填充的中间批次传restore_sorting=False：表格填到一半就恢复排序
+        会按当前排序指示器立即重排，后续批次的按行号写入就会错位。
+        """
+        self._is_updating_from_code = True  # 设置标志以防止递归触发
+        self.stream_table.setSortingEnabled(False)  # 临时禁用排序
+        # 批量填充期间暂停重绘，整个刷新只触发一次relayout
+        self.stream_table.setUpdatesEnabled(False)
+        try:
+            with QSignalBlocker(self.stream_table):
+                fill_func()
+        finally:
+            self.stream_table.setUpdatesEnabled(True)
+            if restore_sorting:
+                self.stream_table.setSortingEnabled(True)  # 重新启用排序
+            self._is_updating_from_code = False  # 重置标志
+
+    def update_table(self, streams):
+        """使用流媒体数据更新表格"""
+        self._table_source = streams
+        self._invalidate_url_row_map()
+        self.stream_table.setRowCount(len(streams))
+
+        if len(streams) > 500:
+            # 大列表分批填充：首批覆盖可视区域后马上绘制，其余行在
+            # 后续事件循环中补齐（近似模型/视图按需提供数据的效果）
+            self._populate_table_chunk(streams, 0)
+        else:
+            def _fill():
+                fill_row = self._fill_table_row
+                for row, stream in enumerate(streams):
+                    fill_row(row, stream)
+
+            self._bulk_table_update(_fill)
+
         # 更新状态栏显示流的总数
         self.update_status_bar(f"当前共有 {len(streams)} 个流。")
         
@@ -748,15 +924,33 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
             new_name = item.text()
             if 0 <= row < len(self.streams):
                 self.streams[row]['name'] = new_name
+                self._streams_dirty = True
                 logger.info(f"流名称已更改为: {new_name}")
                 
+    def _selected_row_indices(self):
+        """返回选中行号的升序列表（每行一个索引，无需按单元格去重）"""
+        return sorted(idx.row() for idx in self.stream_table.selectionModel().selectedRows())
+
     def update_stream_details(self):
-        """当选择更改时，更新流详情显示"""
-        selected_rows = set(item.row() for item in self.stream_table.selectedItems())
+        """选择变化的入口：去抖后再刷新详情面板
+
+        拖拽框选/键盘移动时Qt会连续发出选择变化信号，每次都重建
+        详情文本会造成卡顿；选择集未变时直接返回，变了也只安排一次
+        100ms后的刷新，中间的抖动全部合并。
+        """
+        sel = frozenset(idx.row() for idx in self.stream_table.selectionModel().selectedRows())
+        if sel == self._last_detail_selection:
+            return
+        self._last_detail_selection = sel
+        self._detail_timer.start(100)
+
+    def _do_update_details(self):
+        """实际重建流详情显示"""
+        selected_rows = self._selected_row_indices()
         if not selected_rows:
             self.details_display.clear()
             return
-            
+
         # 如果只选择了一个流，显示详细信息
         if len(selected_rows) == 1:
             row = next(iter(selected_rows))
@@ -789,10 +983,10 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         menu = QMenu(self)
         
         # 获取所有选中的行
-        selected_rows = set(item.row() for item in self.stream_table.selectedItems())
+        selected_rows = self._selected_row_indices()
         if not selected_rows:
             # 如果没有选中行，显示导入和清空选项
-            paste_action = menu.addAction(QIcon.fromTheme("edit-paste"), "从剪贴板导入")
+            paste_action = menu.addAction(self._icon("edit-paste"), "从剪贴板导入")
             menu.addSeparator()
             clear_all_action = menu.addAction("清空列表")
             action = menu.exec(self.stream_table.viewport().mapToGlobal(position))
@@ -810,7 +1004,7 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         copy_name_action = menu.addAction("复制名称")
         rename_action = menu.addAction("重命名")
         menu.addSeparator()
-        paste_action = menu.addAction(QIcon.fromTheme("edit-paste"), "从剪贴板导入")
+        paste_action = menu.addAction(self._icon("edit-paste"), "从剪贴板导入")
         menu.addSeparator()
         remove_action = menu.addAction("删除")
         menu.addSeparator()
@@ -857,7 +1051,7 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         
     def copy_selected_urls(self):
         """复制所选流的URL到剪贴板"""
-        selected_rows = sorted(set(item.row() for item in self.stream_table.selectedItems()))
+        selected_rows = self._selected_row_indices()
         if not selected_rows:
             return
         
@@ -872,7 +1066,7 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         
     def remove_selected_streams(self):
         """删除选中的流"""
-        selected_rows = sorted(set(item.row() for item in self.stream_table.selectedItems()), reverse=True)
+        selected_rows = self._selected_row_indices()[::-1]
         if not selected_rows:
             return
             
@@ -885,13 +1079,21 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            # 从高索引到低索引删除，以避免索引偏移问题
-            for row in selected_rows:
-                if row < len(self.streams):
-                    del self.streams[row]
-            
-            # 更新表格
-            self.update_table(self.streams)
+            # 从高索引到低索引删除，以避免索引偏移问题；
+            # 只移除对应的表格行，不做整表O(N)重建
+            self.stream_table.setUpdatesEnabled(False)
+            try:
+                with QSignalBlocker(self.stream_table):
+                    for row in selected_rows:
+                        if row < len(self.streams):
+                            self._url_set.discard(self.streams[row].get('url'))
+                            del self.streams[row]
+                        self.stream_table.removeRow(row)
+            finally:
+                self.stream_table.setUpdatesEnabled(True)
+            # 删除后行号整体前移，作废URL->行号映射
+            self._invalidate_url_row_map()
+            self._streams_dirty = True
             self.update_status_bar(f"已删除 {len(selected_rows)} 个流")
             
     def check_streams(self):
@@ -909,26 +1111,14 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         # 设置检测状态标志
         self.is_checking = True
         
-        # 获取当前的自动清除选项状态
-        auto_clear = self.auto_clear_invalid_checkbox.isChecked()
-        
-        # 创建并启动检测线程
-        self.check_thread = StreamCheckThread(
-            self.streams, 
-            auto_clear=auto_clear,
-            skip_same_domain_invalid=SKIP_SAME_DOMAIN_INVALID,
-            parent=self
-        )
-        self.check_thread.progress_signal.connect(self.update_check_progress)
-        self.check_thread.stream_updated_signal.connect(self.update_stream_status)
-        self.check_thread.finished_signal.connect(self.handle_check_finished)
-        self.check_thread.start()
-        
+        # 通过异步检查器检测全部流
+        self._start_async_check(self.streams)
+
         self.update_status_bar(f"开始检测 {len(self.streams)} 个流...")
         
     def check_selected_streams(self):
         """检测选中的流"""
-        selected_rows = set(item.row() for item in self.stream_table.selectedItems())
+        selected_rows = self._selected_row_indices()
         if not selected_rows:
             QMessageBox.information(self, "未选择流", "请选择要检测的流。")
             return
@@ -947,22 +1137,40 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         # 设置检测状态标志
         self.is_checking = True
         
-        # 获取当前的自动清除选项状态
-        auto_clear = self.auto_clear_invalid_checkbox.isChecked()
-        
-        # 创建并启动检测线程
-        self.check_thread = StreamCheckThread(
-            selected_streams, 
-            auto_clear=auto_clear,
-            skip_same_domain_invalid=SKIP_SAME_DOMAIN_INVALID,
-            parent=self
-        )
-        self.check_thread.progress_signal.connect(self.update_check_progress)
-        self.check_thread.stream_updated_signal.connect(self.update_stream_status)
-        self.check_thread.finished_signal.connect(self.handle_check_finished)
-        self.check_thread.start()
-        
+        # 通过异步检查器检测选中的流
+        self._start_async_check(selected_streams)
+
         self.update_status_bar(f"开始检测 {len(selected_streams)} 个选中的流...")
+
+    def _start_async_check(self, streams):
+        """在独立线程中通过AsyncIPTVChecker检测给定的流
+
+        单个事件循环 + aiohttp会话即可支撑数千并发请求，
+        替代原先每个流占用一个线程池工作线程的同步检测方式。
+        """
+        self.async_checker = AsyncIPTVChecker(
+            request_timeout=REQUEST_TIMEOUT,
+            max_concurrency=CONCURRENT_CHECKS
+        )
+        self.async_checker.skip_same_domain_invalid = SKIP_SAME_DOMAIN_INVALID
+
+        self.async_runner = AsyncCheckerRunner(self.async_checker, streams)
+        self.async_thread = QThread(self)
+        self.async_runner.moveToThread(self.async_thread)
+        self.async_thread.started.connect(self.async_runner.run)
+        self.async_runner.progress_updated.connect(self.update_check_progress)
+        self.async_runner.stream_updated.connect(self.update_stream_status)
+        self.async_runner.status_updated.connect(self.update_status_bar)
+        self.async_runner.finished.connect(self.handle_async_check_finished)
+        self.async_thread.start()
+
+    def handle_async_check_finished(self, results):
+        """异步检测结束：回收线程后走通用的完成处理"""
+        if self.async_thread is not None:
+            self.async_thread.quit()
+            self.async_thread.wait()
+            self.async_thread = None
+        self.handle_check_finished()
         
     def update_check_progress(self, progress, current, total):
         """更新检测进度"""
@@ -970,6 +1178,38 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         self.status_label.setText(f"检测进度: {progress}% ({current}/{total})")
         
     def update_stream_status(self, index, stream_info):
+        """接收单个流的检测结果，先入缓冲区，由定时器批量刷新UI"""
+        # 高并发下每个流完成都立即重绘会淹没Qt事件循环，这里只记录结果
+        self._pending_updates[index] = stream_info
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_stream_updates(self):
+        """把缓冲区中的检测结果一次性写入表格"""
+        if not self._pending_updates:
+            if not self.is_checking:
+                self._flush_timer.stop()
+            return
+        pending, self._pending_updates = self._pending_updates, {}
+        # 整批更新只切换一次排序状态、只触发一次重绘
+        was_sorting_enabled = self.stream_table.isSortingEnabled()
+        if was_sorting_enabled:
+            self.stream_table.setSortingEnabled(False)
+        self.stream_table.setUpdatesEnabled(False)
+        self._is_updating_from_code = True
+        try:
+            # 阻断信号发射本身：状态单元格的每次setText不再各自
+            # 往handle_item_changed里空跑一次Python槽调用
+            with QSignalBlocker(self.stream_table):
+                for index, stream_info in pending.items():
+                    self._apply_stream_update(index, stream_info)
+        finally:
+            self._is_updating_from_code = False
+            self.stream_table.setUpdatesEnabled(True)
+            if was_sorting_enabled:
+                self.stream_table.setSortingEnabled(True)
+
+    def _apply_stream_update(self, index, stream_info):
         """更新流的状态信息"""
         # 在流列表中更新对应的流
         if 0 <= index < len(self.streams):
@@ -985,71 +1225,43 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
                 self.streams[index]['group'] = original_group
             if not self.streams[index].get('country') and original_country:
                 self.streams[index]['country'] = original_country
-            
-            # 查找表格中对应的行
+
+            # 检测结果改变了状态/分辨率/响应时间，重新计算筛选编码
+            _annotate_filter_codes(self.streams[index])
+            self._streams_dirty = True
+
+            # 查找表格中对应的行：哈希查找取代逐行扫描
             url = self.streams[index].get('url', '')
-            row_to_update = -1
-            
-            # 遍历表格查找匹配的URL
-            for row in range(self.stream_table.rowCount()):
-                if hasattr(self.stream_table.item(row, 2), 'full_url'):
-                    table_url = self.stream_table.item(row, 2).full_url
-                    if table_url == url:
-                        row_to_update = row
-                        break
-            
+            if self._url_to_row is None:
+                self._rebuild_url_row_map()
+            row_to_update = self._url_to_row.get(url, -1)
+
+            # 映射可能因排序/删除而过期：命中后校验一次，不符则重建重查
+            item = self.stream_table.item(row_to_update, 2) if row_to_update >= 0 else None
+            if row_to_update >= 0 and getattr(item, 'full_url', None) != url:
+                self._rebuild_url_row_map()
+                row_to_update = self._url_to_row.get(url, -1)
+
             logger.debug(f"更新流状态: 索引={index}, URL={url}, 行={row_to_update}, 状态={stream_info.get('status', '')}")
             
             if row_to_update >= 0:
-                # 暂时禁用排序，以防止更新时表格行顺序改变
-                was_sorting_enabled = self.stream_table.isSortingEnabled()
-                if was_sorting_enabled:
-                    self.stream_table.setSortingEnabled(False)
-                
-                try:
-                    # 更新分类
-                    group = self.streams[index].get('group', '')
-                    group_item = QTableWidgetItem(group)
-                    self.stream_table.setItem(row_to_update, 3, group_item)
-                    
-                    # 更新归属地
-                    country = self.streams[index].get('country', '')
-                    country_item = QTableWidgetItem(country)
-                    self.stream_table.setItem(row_to_update, 4, country_item)
-                    
-                    # 更新分辨率
-                    resolution = stream_info.get('resolution', '')
-                    resolution_item = QTableWidgetItem(resolution)
-                    self.stream_table.setItem(row_to_update, 5, resolution_item)
-                    
-                    # 更新响应时间
-                    response_time = stream_info.get('response_time', '')
-                    if response_time:
-                        response_time_item = QTableWidgetItem(str(response_time))
-                        response_time_item.setData(Qt.ItemDataRole.DisplayRole, response_time)
-                    else:
-                        response_time_item = QTableWidgetItem('')
-                    self.stream_table.setItem(row_to_update, 6, response_time_item)
-                    
-                    # 更新状态并设置颜色
-                    status = stream_info.get('status', '')
-                    status_item = QTableWidgetItem(status)
-                    if status.lower() == '正常':
-                        status_item.setForeground(QColor(0, 200, 0))  # 绿色
-                    elif status.lower() in ['无效源', '错误']:
-                        status_item.setForeground(QColor(255, 0, 0))  # 红色
-                    self.stream_table.setItem(row_to_update, 7, status_item)
-                    
-                    # 强制更新表格视图
-                    self.stream_table.viewport().update()
-                    
-                    # 确保应用程序处理所有待处理的事件，立即更新UI
-                    QApplication.processEvents()
-                    
-                finally:
-                    # 恢复排序状态
-                    if was_sorting_enabled:
-                        self.stream_table.setSortingEnabled(True)
+                # 更新分类
+                self._set_table_cell(row_to_update, 3, self.streams[index].get('group', ''))
+
+                # 更新归属地
+                self._set_table_cell(row_to_update, 4, self.streams[index].get('country', ''))
+
+                # 更新分辨率
+                self._set_table_cell(row_to_update, 5, stream_info.get('resolution', ''))
+
+                # 更新响应时间
+                response_time = stream_info.get('response_time', '')
+                response_time_item = self._set_table_cell(row_to_update, 6, str(response_time) if response_time else '')
+                if response_time:
+                    response_time_item.setData(Qt.ItemDataRole.DisplayRole, response_time)
+
+                # 更新状态（颜色由状态列的绘制委托在绘制时决定）
+                self._set_table_cell(row_to_update, 7, stream_info.get('status', ''))
             else:
                 # 如果找不到对应的行，可能是因为过滤器隐藏了这一行
                 # 记录一下日志
@@ -1057,6 +1269,10 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         
     def handle_check_finished(self):
         """处理检测完成事件"""
+        # 把缓冲区中剩余的结果刷入表格后停掉定时器
+        self._flush_stream_updates()
+        self._flush_timer.stop()
+
         # 检测完成后更新界面
         self.stop_button.setEnabled(False)
         self.check_button.setEnabled(True)
@@ -1073,8 +1289,14 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
             
     def stop_checking(self):
         """停止当前的检测进程"""
+        stopped = False
+        if self.async_checker is not None and self.is_checking:
+            self.async_checker.stop_check()
+            stopped = True
         if self.check_thread and self.check_thread.isRunning():
             self.check_thread.stop()
+            stopped = True
+        if stopped:
             # 重置检测状态标志
             self.is_checking = False
             # 恢复按钮状态
@@ -1101,58 +1323,39 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
             self.update_table(self.streams)
             return
             
-        # 用于符合筛选条件的流
+        # 把下拉框文本一次性换算成整数阈值，-1表示该维度不筛选
+        want_status = _STATUS_FILTER_CODES.get(status_filter, -1) if status_filter != "全部" else -1
+        want_res = _RES_FILTER_CODES.get(resolution_filter, -1) if resolution_filter != "全部" else -1
+        time_limit = int(response_filter.split('毫秒')[0]) if response_filter != "全部" else -1
+
+        # 单次遍历，每行只做三次整数比较（编码在插入/检测时已预计算）
         filtered_streams = []
-        
-        # 应用状态筛选
-        if status_filter == "全部":
-            status_streams = self.streams
-        else:
-            status_streams = [s for s in self.streams if s.get('status', '').lower() == status_filter.lower()]
-            
-        # 应用分辨率筛选
-        if resolution_filter == "全部":
-            resolution_streams = status_streams
-        else:
-            # 根据分辨率区分，可能需要更详细的逻辑
-            resolution_streams = []
-            for s in status_streams:
-                res = s.get('resolution', '').lower()
-                if resolution_filter == "4K" and '4k' in res:
-                    resolution_streams.append(s)
-                elif resolution_filter == "FHD" and ('1080' in res or 'fhd' in res):
-                    resolution_streams.append(s)
-                elif resolution_filter == "HD" and ('720' in res or 'hd' in res) and '1080' not in res:
-                    resolution_streams.append(s)
-                elif resolution_filter == "SD" and any(x in res for x in ['480', '576', 'sd']):
-                    resolution_streams.append(s)
-                    
-        # 应用响应时间筛选
-        if response_filter == "全部":
-            filtered_streams = resolution_streams
-        else:
-            # 解析响应时间限制
-            time_limit = int(response_filter.split('毫秒')[0])
-            filtered_streams = [s for s in resolution_streams if s.get('response_time', 999999) <= time_limit]
+        for s in self.streams:
+            if '_status_code' not in s:
+                _annotate_filter_codes(s)
+            if want_status >= 0 and s['_status_code'] != want_status:
+                continue
+            if want_res >= 0 and s['_res_code'] != want_res:
+                continue
+            if time_limit >= 0 and s['_rt_ms'] > time_limit:
+                continue
+            filtered_streams.append(s)
             
         # 合并相似频道
         if self.merge_checkbox.isChecked():
-            # 实现合并相似频道的逻辑，这里简单处理
-            # 实际上可能需要更复杂的字符串相似度检测
-            name_groups = {}
+            # 同名频道只保留一个，优先"正常"状态；单次遍历即可，
+            # 不需要为每组构建列表再排序
+            best_by_name = {}
             for s in filtered_streams:
                 name = s.get('name', '').strip()
-                if name:
-                    key = name.lower()
-                    if key not in name_groups:
-                        name_groups[key] = []
-                    name_groups[key].append(s)
-            
-            merged_streams = []
-            for name, streams in name_groups.items():
-                # 按状态排序，优先选择"正常"的流
-                sorted_streams = sorted(streams, key=lambda s: 0 if s.get('status', '').lower() == '正常' else 1)
-                merged_streams.append(sorted_streams[0])
+                if not name:
+                    continue
+                key = name.lower()
+                current = best_by_name.get(key)
+                if current is None or (s.get('_status_code') == 1
+                                       and current.get('_status_code') != 1):
+                    best_by_name[key] = s
+            merged_streams = list(best_by_name.values())
         else:
             merged_streams = filtered_streams
             
@@ -1182,50 +1385,29 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         if not file_path:  # 用户取消了文件选择
             return
             
-        try:
-            if format_type.lower() == "m3u":
-                # 导出为M3U格式
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write("#EXTM3U\n")
-                    for stream in self.streams:
-                        name = stream.get('name', 'Unknown')
-                        group = stream.get('group', '')
-                        country = stream.get('country', '')
-                        logo = stream.get('logo', '')
-                        url = stream.get('url', '')
-                        
-                        # 添加扩展信息
-                        f.write(f'#EXTINF:-1 tvg-name="{name}"')
-                        if group:
-                            f.write(f' group-title="{group}"')
-                        if country:
-                            f.write(f' tvg-country="{country}"')
-                        if logo:
-                            f.write(f' tvg-logo="{logo}"')
-                        f.write(f',{name}\n')
-                        
-                        # 添加URL
-                        f.write(f'{url}\n')
-            else:
-                # 导出为TXT格式
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    for stream in self.streams:
-                        name = stream.get('name', 'Unknown')
-                        url = stream.get('url', '')
-                        f.write(f'{name},{url}\n')
-                        
-            QMessageBox.information(
-                self, "导出成功", 
-                f"成功导出 {len(self.streams)} 个流到文件:\n{file_path}"
-            )
-            logger.info(f"已导出 {len(self.streams)} 个流到 {file_path}")
-            self.update_status_bar(f"已导出 {len(self.streams)} 个流。")
-            
-        except Exception as e:
-            error_msg = f"导出失败: {str(e)}"
+        # 写文件放到后台线程，大列表导出时界面保持响应
+        self.import_progress_bar.setVisible(True)
+        self.import_progress_bar.setValue(0)
+        self.update_status_bar(f"正在导出 {len(self.streams)} 个流...")
+        # 传入列表快照，导出期间的增删不影响写出的文件
+        self.export_thread = ExportThread(list(self.streams), file_path, format_type, self)
+        self.export_thread.progress_signal.connect(self.update_import_progress)
+        self.export_thread.finished_signal.connect(
+            lambda error_msg, count, path=file_path: self.handle_export_finished(error_msg, count, path))
+        self.export_thread.start()
+
+    def handle_export_finished(self, error_msg, count, file_path):
+        """处理导出完成信号"""
+        self.import_progress_bar.setVisible(False)
+        if error_msg:
             QMessageBox.critical(self, "导出错误", error_msg)
-            logger.error(error_msg)
             self.update_status_bar(error_msg)
+            return
+        QMessageBox.information(
+            self, "导出成功",
+            f"成功导出 {count} 个流到文件:\n{file_path}"
+        )
+        self.update_status_bar(f"已导出 {count} 个流。")
             
     def load_stream_list_on_startup(self):
         """在程序启动时加载之前保存的流列表"""
@@ -1236,20 +1418,46 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
             streams = load_stream_list()
             if streams:
                 self.streams = streams
+                self._rebuild_url_set()
+                # 分批填充表格，批次间让出事件循环，窗口立即可交互
                 self.update_table(self.streams)
                 logger.info(f"成功加载 {len(streams)} 个流")
                 self.update_status_bar(f"从配置文件加载了 {len(streams)} 个流。")
         except Exception as e:
             logger.error(f"加载流列表失败: {str(e)}")
             # 不向用户显示错误，因为这只是启动功能
+
+    def _populate_table_chunk(self, streams, start, chunk_size=500):
+        """从start行起填充一批行，剩余部分通过singleShot排队到下一轮事件循环"""
+        if streams is not self._table_source:
+            return  # 已有更新的刷新接管表格，放弃这次排队的填充
+        end = min(start + chunk_size, len(streams))
+
+        def _fill():
+            fill_row = self._fill_table_row
+            for row in range(start, end):
+                fill_row(row, streams[row])
+
+        # 排序只在最后一批填完后恢复：中途恢复会让表格按排序指示器重排，
+        # 之后的批次再按行号定位就会写进错误的行
+        is_last_chunk = end >= len(streams)
+        self._bulk_table_update(_fill, restore_sorting=is_last_chunk)
+        self._invalidate_url_row_map()
+        if not is_last_chunk:
+            QTimer.singleShot(0, lambda: self._populate_table_chunk(streams, end, chunk_size))
             
     def closeEvent(self, event):
         """当窗口关闭时调用，用于保存设置和清理资源"""
-        # 保存流列表（如果配置了保存）
-        if SAVE_STREAM_LIST and self.streams:
+        # 保存流列表（如果配置了保存）：列表没变时直接跳过；
+        # 有变化时在后台线程写盘（非daemon，进程退出前会等它写完），
+        # 序列化几万个流不再拖慢窗口关闭
+        if SAVE_STREAM_LIST and self.streams and self._streams_dirty:
             try:
-                save_stream_list(self.streams)
-                logger.info(f"关闭时保存了 {len(self.streams)} 个流到配置文件")
+                import threading
+                threading.Thread(
+                    target=save_stream_list, args=(list(self.streams),)
+                ).start()
+                logger.info(f"关闭时在后台保存 {len(self.streams)} 个流到配置文件")
             except Exception as e:
                 logger.error(f"保存流列表失败: {str(e)}")
                 
@@ -1268,13 +1476,20 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         if self.import_thread and self.import_thread.isRunning():
             self.import_thread.is_cancelled = True
             self.import_thread.wait()
-            
+
+        # 等待进行中的导出写完文件
+        if self.export_thread and self.export_thread.isRunning():
+            self.export_thread.wait()
+
+        # 停掉检查器的后台状态刷新线程
+        self.checker.shutdown()
+
         # 接受关闭事件，继续关闭窗口
         event.accept()
 
     def copy_selected_names(self):
         """复制所选流的名称到剪贴板"""
-        selected_rows = sorted(set(item.row() for item in self.stream_table.selectedItems()))
+        selected_rows = self._selected_row_indices()
         if not selected_rows:
             return
         
@@ -1303,6 +1518,8 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{ width: 0px;
         
         if reply == QMessageBox.StandardButton.Yes:
             self.streams = []
+            self._url_set = set()
+            self._streams_dirty = True
             self.update_table(self.streams)
             self.update_status_bar("已清空所有流")
 
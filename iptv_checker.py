@@ -2,25 +2,64 @@
 # 修改记录：
 # 1. 添加了对中文地理位置信息的支持，通过lang=zh-CN参数获取中文地理位置
 import os
+import re
 import time
 import json
 import requests
 import threading
 import socket
+import selectors
+from collections import Counter, deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from loguru import logger
 from tqdm import tqdm
-from urllib.parse import urlparse
-from config import ( CONNECTION_TIMEOUT, MAX_WORKERS, OPENCV_TIMEOUT ) # OPENCV_TIMEOUT 将被 self.request_timeout 替代, MAX_WORKERS 被 self.concurrent_checks 替代
+from urllib.parse import urlparse, urlsplit
+from functools import lru_cache
+from config import ( CONNECTION_TIMEOUT, MAX_WORKERS, OPENCV_TIMEOUT, LOG_DIR ) # OPENCV_TIMEOUT 将被 self.request_timeout 替代, MAX_WORKERS 被 self.concurrent_checks 替代
 import numpy as np
-import numba
 
-@numba.jit(nopython=True)
-def _resolution_to_pixels_fast(width, height):
-    """使用Numba加速的分辨率计算函数"""
-    return width * height
+@lru_cache(maxsize=4096)
+def _host_of(url):
+    """缓存URL到主机名的解析，界面反复排序/过滤时同一URL只解析一次"""
+    try:
+        return urlsplit(url).netloc
+    except ValueError:
+        return ''
+
+@lru_cache(maxsize=4096)
+def _host_port_of(host_str):
+    """缓存 "hostname[:port]" 到 (host, port) 的拆分，同一主机只拆一次"""
+    if ':' in host_str:
+        host, port_str = host_str.split(':', 1)
+        try:
+            port = int(port_str)
+        except ValueError:
+            port = 80
+        return host, port
+    return host_str, 80
+
+@lru_cache(maxsize=4096)
+def _resolution_to_pixels(resolution):
+    """把 "宽x高" 字符串换算成像素数（带缓存，同一分辨率串只解析一次）"""
+    if 'x' in resolution:
+        try:
+            width, height = map(int, resolution.split('x', 1))
+            return width * height
+        except ValueError:
+            pass
+    return 0
 
 class IPTVChecker:
+    # 典型流媒体URL特征：一次正则扫描代替对全URL的多趟lower()+子串查找
+    _STREAM_EXT_RE = re.compile(r'\.(?:m3u8|ts|mp4|flv|hls)|rtmp://|rtsp://', re.IGNORECASE)
+
+    # HEAD快路径共用的HTTP会话，同样挂连接池适配器复用TCP连接
+    _probe_session = requests.Session()
+    _probe_session.mount('http://', requests.adapters.HTTPAdapter(
+        pool_connections=16, pool_maxsize=32, max_retries=0))
+    _probe_session.mount('https://', requests.adapters.HTTPAdapter(
+        pool_connections=16, pool_maxsize=32, max_retries=0))
+
     def __init__(self):
         self.concurrent_checks = MAX_WORKERS  # 默认值，将被配置覆盖
         self.request_timeout = OPENCV_TIMEOUT # 默认值，将被配置覆盖
@@ -29,7 +68,20 @@ class IPTVChecker:
         self.progress_callback = None # 初始化进度回调
         self.status_callback = None # 初始化状态回调
         self._invalid_domains = {}  # 存储无效域名计数
+        self._invalid_domains_lock = threading.Lock()  # 保护无效计数的读-改-写
+        self._domain_attempts = Counter()  # 各域名的探测次数（自适应重试用）
+        self._domain_timeouts = Counter()  # 各域名的超时次数
+        self._domain_cache = {}  # 域名负缓存：域名 -> (状态, 过期时间戳)
+        self._domain_cache_ttl = 60  # 负缓存有效期（秒），过期后给主机重新检测的机会
         self.skip_same_domain_invalid = False # 是否跳过同一域名下的无效源
+        self._filter_index = None  # 过滤用的列式索引（分辨率/响应时间/状态三个数组），惰性重建
+        self._reachable = {}  # 本轮检测开始时批量探测的主机可连性结果
+        self._url_result_cache = {}  # 本轮检测内 URL -> (分辨率, 状态)，重复URL不再重复探测
+        # 状态更新队列：工作线程追加，后台守护线程按周期排空并回调GUI
+        self._status_queue = deque(maxlen=4096)
+        self._stop_status_flush = threading.Event()
+        threading.Thread(target=self._status_flush_loop, daemon=True).start()
+        self._load_location_cache() # 载入上次运行留下的地理位置缓存
     def update_settings(self, concurrent_checks, request_timeout):
         """更新检查器的设置"""
         self.concurrent_checks = concurrent_checks
@@ -70,17 +122,18 @@ class IPTVChecker:
                 logger.error(f"不支持的文件格式: {file_ext}")
                 return []
             # Add IDs to all streams if they don't have one
+            stream_re_search = self._STREAM_EXT_RE.search
             for i, stream in enumerate(imported_streams):
                 if 'id' not in stream:
                     stream['id'] = i + 1
+                # 导入时一次性分类：典型流媒体URL检测时可先走HEAD快路径
+                stream['_needs_probe'] = not stream_re_search(stream.get('url', ''))
             self.streams = imported_streams
+            self._filter_index = None  # 流列表换了，列式索引作废
             return imported_streams
         except Exception as e:
             logger.error(f"导入流时出错: {str(e)}")
             return []
-    # 添加批量更新缓冲区和计时器
-    _status_update_buffer = {}
-    _last_status_update_time = 0
     _status_update_interval = 0.1  # 100毫秒更新一次
     def _update_stream_status(self, stream):
         """
@@ -88,22 +141,37 @@ class IPTVChecker:
         Args:
             stream: 包含流数据的字典
         """
-        # 如果设置了状态回调函数，则将更新添加到缓冲区
+        # 检测结果改变了流属性，列式索引下次过滤时重建
+        self._filter_index = None
+        # 工作线程只往队列里追加（deque.append在GIL下是原子的），
+        # 不再在热路径上取time.time()和读写共享字典
         if self.status_callback:
-            # 创建一个包含流ID和更新状态的消息
             message = {k: stream[k] for k in ['id', 'status', 'resolution', 'response_time'] if k in stream}
-            # 将消息添加到缓冲区
-            stream_id = stream.get('id')
-            self._status_update_buffer[stream_id] = message
-            # 检查是否应该发送批量更新
-            current_time = time.time()
-            if (current_time - self._last_status_update_time >= self._status_update_interval) or len(self._status_update_buffer) >= 10:
-                # 发送所有缓冲的更新
-                for buffered_message in self._status_update_buffer.values():
-                    self.status_callback(f"stream_update:{json.dumps(buffered_message)}")
-                # 清空缓冲区并更新时间戳
-                self._status_update_buffer.clear()
-                self._last_status_update_time = current_time
+            self._status_queue.append(message)
+
+    def _status_flush_loop(self):
+        """后台消费线程：每100毫秒排空状态队列并按流ID去重后发给GUI"""
+        while not self._stop_status_flush.is_set():
+            time.sleep(self._status_update_interval)
+            self._flush_status_queue()
+        # 退出前再排空一次，收尾的那批更新不丢
+        self._flush_status_queue()
+
+    def _flush_status_queue(self):
+        """排空状态队列，按流ID去重后批量发给GUI"""
+        if not self._status_queue or not self.status_callback:
+            return
+        # 同一个流在一个周期内的多次更新只保留最后一条
+        latest = {}
+        while True:
+            try:
+                message = self._status_queue.popleft()
+            except IndexError:
+                break
+            latest[message.get('id')] = message
+        # 整个周期只做一次dumps、发一次回调，序列化和跨线程投递按批摊销
+        payload = json.dumps(list(latest.values()), separators=(',', ':'))
+        self.status_callback(f"stream_update_batch:{payload}")
     def check_stream(self, stream):
         """
         检查单个流的有效性并获取其详细信息
@@ -143,14 +211,19 @@ class IPTVChecker:
         start_time = time.time()
         
         try:
-            # 解析URL获取域名
-            parsed_url = urlparse(url)
-            domain = parsed_url.netloc
-            
+            # 解析URL获取域名（带缓存）
+            domain = _host_of(url)
+
             # 检查是否需要跳过同域名下的流
             if self.skip_same_domain_invalid and domain:
-                if domain in self._invalid_domains and self._invalid_domains[domain] >= 3:
-                    # 如果同域名已有3个以上无效源，直接标记为无效并跳过检测
+                cached = self._domain_cache.get(domain)
+                if cached is not None and cached[1] <= time.time():
+                    # 负缓存已过期：清除计数，让该主机重新接受检测
+                    del self._domain_cache[domain]
+                    self._invalid_domains.pop(domain, None)
+                    cached = None
+                if cached is not None:
+                    # 命中域名负缓存，O(1)判定无效，不发起任何网络请求
                     stream['status'] = '无效源(已跳过)'
                     stream['resolution'] = 'N/A'
                     stream['response_time'] = -1
@@ -165,9 +238,17 @@ class IPTVChecker:
                     logger.debug(f"域名 {domain} 已检测到多个无效源，跳过检测: {stream.get('name', 'Unknown')}")
                     return stream
             
-            # 检查连接是否可用
+            # 每个网络子步骤前都复查停止标志，停止响应时间从整次检测缩短到单个子调用
+            if self._stop_requested.is_set():
+                stream['status'] = '已取消'
+                return stream
+
+            # 检查连接是否可用（优先使用批量预探测的结果，避免每个流再阻塞0.5秒）
             try:
-                connection_ok = self._test_connection(domain, timeout=0.5)
+                if domain in self._reachable:
+                    connection_ok = self._reachable[domain]
+                else:
+                    connection_ok = self._test_connection(domain, timeout=0.5)
                 
                 # 尝试获取位置信息（使用缓存）
                 if domain:
@@ -188,16 +269,66 @@ class IPTVChecker:
                     logger.debug(f"连接测试失败，但继续检测流: {url}")
             except Exception as e:
                 logger.debug(f"URL解析或连接测试错误 {url}: {str(e)}")
-            
-            # 获取流信息
-            resolution, status = self._get_stream_info(url)
-            
-            # 对超时错误进行一次重试
-            if status == "TIMEOUT":
-                logger.info(f"流 {url} 检测超时，将在0.5秒后重试...")
-                time.sleep(0.5)
-                resolution, status = self._get_stream_info(url)
-                logger.info(f"流 {url} 重试检测结果 - 状态: {status}, 分辨率: {resolution}")
+
+            # 停止请求到达时立即让出线程槽位，不再发起最贵的流信息探测
+            if self._stop_requested.is_set():
+                stream['status'] = '已取消'
+                return stream
+
+            # 同一URL在列表里常出现多次（镜像/备用源），本轮已探测过的直接复用结果
+            cached_result = self._url_result_cache.get(url)
+            if cached_result is not None:
+                resolution, status = cached_result
+            else:
+                # 典型流媒体URL先试一次HEAD快路径：2xx即判有效，
+                # 省掉占每个流大头耗时的播放器冷启动；不明确时再做完整探测
+                status = None
+                resolution = 'N/A'
+                if not stream.get('_needs_probe', True) and url.startswith(('http://', 'https://')):
+                    try:
+                        head_resp = self._probe_session.head(
+                            url, timeout=self.request_timeout, allow_redirects=True)
+                        if head_resp.status_code in (200, 206):
+                            resolution, status = '未知', 'OK'
+                    except Exception:
+                        pass
+                    if status is None:
+                        # 不少流媒体服务器拒绝HEAD：再用Range只取第一个字节，
+                        # 一个RTT、约两百字节流量就能确认存活
+                        try:
+                            range_resp = self._probe_session.get(
+                                url, headers={'Range': 'bytes=0-0'},
+                                timeout=self.request_timeout, stream=True,
+                                allow_redirects=True)
+                            try:
+                                if range_resp.status_code in (200, 206):
+                                    resolution, status = '未知', 'OK'
+                            finally:
+                                range_resp.close()
+                        except Exception:
+                            pass
+
+                # 获取流信息（HEAD没给出结论时才走播放器探测）
+                if status is None:
+                    resolution, status = self._get_stream_info(url)
+                    if domain:
+                        # 记录该域名的探测/超时次数，为自适应重试提供依据
+                        with self._invalid_domains_lock:
+                            self._domain_attempts[domain] += 1
+                            if status == "TIMEOUT":
+                                self._domain_timeouts[domain] += 1
+
+                # 对超时错误进行一次重试（超时率过半的域名不再浪费重试预算）
+                if status == "TIMEOUT" and self._retry_worthwhile(domain):
+                    logger.info(f"流 {url} 检测超时，将在0.5秒后重试...")
+                    # 等在停止事件上而不是裸睡，停止请求能立即打断重试等待
+                    if self._stop_requested.wait(0.5):
+                        stream['status'] = '已取消'
+                        return stream
+                    resolution, status = self._get_stream_info(url)
+                    logger.info(f"流 {url} 重试检测结果 - 状态: {status}, 分辨率: {resolution}")
+
+                self._url_result_cache[url] = (resolution, status)
             
             # 判断流是否有效
             is_valid = (status == "OK" or resolution != "N/A")
@@ -205,7 +336,7 @@ class IPTVChecker:
             # 对于特定格式的URL，即使检测失败也可能是有效的
             if not is_valid and url:
                 # 检查是否是典型的流媒体URL格式
-                is_stream_url = any(ext in url.lower() for ext in ['.m3u8', '.ts', '.mp4', '.flv', '.hls', 'rtmp://', 'rtsp://'])
+                is_stream_url = bool(self._STREAM_EXT_RE.search(url))
                 if is_stream_url:
                     logger.debug(f"URL格式是典型的流媒体格式，认为可能有效: {url}")
                     is_valid = True
@@ -221,8 +352,8 @@ class IPTVChecker:
             
             # 如果流无效且启用了域名跳过功能，更新域名无效计数
             if not is_valid and domain and self.skip_same_domain_invalid:
-                self._invalid_domains[domain] = self._invalid_domains.get(domain, 0) + 1
-            
+                self._record_invalid_domain(domain)
+
             # 实时更新状态
             self._update_stream_status(stream)
             return stream
@@ -244,13 +375,35 @@ class IPTVChecker:
             
             # 获取域名并更新无效域名计数
             try:
-                domain = urlparse(url).netloc
+                domain = _host_of(url)
                 if domain and self.skip_same_domain_invalid:
-                    self._invalid_domains[domain] = self._invalid_domains.get(domain, 0) + 1
+                    self._record_invalid_domain(domain)
             except:
                 pass
-                
+
             return stream
+
+    def _retry_worthwhile(self, domain):
+        """超时重试的自适应门控：停止中或域名超时率过半时直接放弃重试"""
+        if self._stop_requested.is_set():
+            return False
+        if not domain:
+            return True
+        with self._invalid_domains_lock:
+            attempts = self._domain_attempts.get(domain, 0)
+            timeouts = self._domain_timeouts.get(domain, 0)
+        # 样本不足10次时总是给重试机会，之后要求超时率不超过一半
+        return attempts <= 10 or timeouts * 2 <= attempts
+
+    def _record_invalid_domain(self, domain):
+        """累计域名失败次数，连续失败达到阈值后写入带TTL的负缓存"""
+        # 多个工作线程会同时累加同一域名，读-改-写需要加锁才不丢计数
+        with self._invalid_domains_lock:
+            count = self._invalid_domains.get(domain, 0) + 1
+            self._invalid_domains[domain] = count
+            self._prune_cache(self._invalid_domains, 5000)
+        if count >= 3:
+            self._domain_cache[domain] = ('无效源', time.time() + self._domain_cache_ttl)
     def check_all_streams(self, streams=None):
         """优化后的流检查函数，使用更高效的ThreadPoolExecutor配置"""
         if streams is None:
@@ -260,7 +413,18 @@ class IPTVChecker:
         
         # 重置停止标志
         self._stop_requested.clear()
-        
+
+        # 批量预取地理位置，检测过程中的查询直接命中缓存
+        self._prefetch_locations(streams)
+
+        # 批量预测主机可连性，检测线程里不再各自阻塞0.5秒做connect探测
+        hosts = {_host_of(s.get('url', '')) for s in streams}
+        hosts.discard('')
+        self._reachable = self._bulk_test_connections(hosts)
+
+        # 每轮检测都从干净的URL结果缓存开始，不把上一轮的状态带进来
+        self._url_result_cache = {}
+
         # 优化线程池配置
         import concurrent.futures
         from concurrent.futures import ThreadPoolExecutor
@@ -283,8 +447,12 @@ class IPTVChecker:
             thread_name_prefix="IPTVCheck",
             initializer=lambda: None  # 可以添加线程初始化函数
         ) as executor:
+            # 按域名排序后提交：同域名的流相邻执行，DNS/地理缓存背靠背命中，
+            # 域名三振之后其余同域流立即走跳过路径，而不是穿插在队列各处
+            streams_sorted = sorted(
+                streams, key=lambda s: (_host_of(s.get('url', '')), s.get('id', 0)))
             # 提交所有任务
-            futures = [executor.submit(self.check_stream, stream) for stream in streams]
+            futures = [executor.submit(self.check_stream, stream) for stream in streams_sorted]
             
             # 使用迭代器处理结果，减少内存占用
             results = []
@@ -314,29 +482,43 @@ class IPTVChecker:
         if self.status_callback:
             self.status_callback("停止流检查...")
 
+    def shutdown(self):
+        """检查器退役时停掉后台状态刷新线程，不让它空转到进程结束"""
+        self._stop_status_flush.set()
+
+    def _rebuild_filter_index(self):
+        """把流列表重排成列式数组（分辨率像素/响应时间/状态），供向量化过滤使用"""
+        streams = self.streams
+        to_pixels = self._resolution_to_pixels
+        self._filter_index = (
+            np.array([to_pixels(s.get('resolution', '0x0')) for s in streams], dtype=np.int64),
+            np.array([s.get('response_time', 999999) for s in streams], dtype=np.float64),
+            np.array([s.get('status', '') for s in streams], dtype=object),
+        )
+
     def filter_streams(self, min_resolution=None, max_response_time=None, status=None):
         """优化后的流过滤函数"""
         if not self.streams:
             return []
-        
-        # 转换为NumPy数组以实现向量化操作
-        streams_array = np.array(self.streams, dtype=object)
-        mask = np.ones(len(streams_array), dtype=bool)
-        
+
+        # 列式索引只在流数据变化后重建一次，反复调整过滤条件时直接复用
+        if self._filter_index is None or len(self._filter_index[0]) != len(self.streams):
+            self._rebuild_filter_index()
+        resolutions, response_times, statuses = self._filter_index
+        mask = np.ones(len(self.streams), dtype=bool)
+
         if min_resolution:
             min_pixels = self._resolution_to_pixels(min_resolution)
-            resolutions = np.array([self._resolution_to_pixels(s.get('resolution', '0x0')) for s in self.streams])
             mask &= (resolutions >= min_pixels)
-        
+
         if max_response_time and max_response_time > 0:
-            response_times = np.array([s.get('response_time', 999999) for s in self.streams])
             mask &= (response_times <= max_response_time)
-        
+
         if status:
-            status_mask = np.array([s.get('status', '') == status for s in self.streams])
-            mask &= status_mask
-        
-        return streams_array[mask].tolist()
+            mask &= (statuses == status)
+
+        streams = self.streams
+        return [streams[i] for i in np.flatnonzero(mask)]
     def export_streams(self, file_path, streams=None, export_format=None):
         """
         Export streams to a file
@@ -404,31 +586,200 @@ class IPTVChecker:
             布尔值，表示是否可以连接
         """
         try:
-            # 提取主机和端口
-            if ':' in host_str:
-                host, port_str = host_str.split(':', 1)
-                try:
-                    port = int(port_str)
-                except ValueError:
-                    port = 80
-            else:
-                host = host_str
-                port = 80
-                
+            # 提取主机和端口（带缓存，同一主机的多个流只拆分一次）
+            host, port = _host_port_of(host_str)
+
+            # 先走TTL化的DNS缓存，connect时不再隐式重复解析同一主机名
+            ip = self._resolve(host)
+            if ip is None:
+                return False
+
             # 使用提供的超时时间或默认值
             actual_timeout = timeout if timeout is not None else CONNECTION_TIMEOUT
-            
+
             # 尝试建立连接
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.settimeout(actual_timeout)
-            result = sock.connect_ex((host, port))
+            result = sock.connect_ex((ip, port))
             sock.close()
             return result == 0
         except Exception as e:
             logger.debug(f"连接测试错误，原因是 {host_str}: {str(e)}")
             return False
+
+    def _bulk_test_connections(self, host_strs, timeout=0.5, max_fds=512):
+        """
+        用非阻塞connect加selectors并发探测一批主机的可连性
+        Args:
+            host_strs: 主机字符串集合（"hostname" 或 "hostname:port"）
+            timeout: 每批探测的等待时间（秒）
+            max_fds: 单批同时打开的socket上限
+        Returns:
+            {主机字符串: 是否可连} 字典
+        """
+        results = {}
+        pending = []
+        for host_str in host_strs:
+            host, port = _host_port_of(host_str)
+            ip = self._resolve(host)
+            if ip is None:
+                results[host_str] = False
+                continue
+            pending.append((host_str, ip, port))
+        # 分批发起非阻塞connect，一次select等待整批完成，耗时按批摊成一个超时
+        for i in range(0, len(pending), max_fds):
+            if self._stop_requested.is_set():
+                break
+            sel = selectors.DefaultSelector()
+            try:
+                for host_str, ip, port in pending[i:i + max_fds]:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.setblocking(False)
+                    try:
+                        sock.connect_ex((ip, port))
+                        sel.register(sock, selectors.EVENT_WRITE, host_str)
+                    except Exception:
+                        sock.close()
+                        results[host_str] = False
+                deadline = time.time() + timeout
+                while sel.get_map():
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    for key, _ in sel.select(remaining):
+                        sock = key.fileobj
+                        # 可写后用SO_ERROR区分真正连上还是连接被拒
+                        results[key.data] = sock.getsockopt(
+                            socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                        sel.unregister(sock)
+                        sock.close()
+            finally:
+                # 超时仍未完成的一律视为不可连
+                for key in list(sel.get_map().values()):
+                    results.setdefault(key.data, False)
+                    key.fileobj.close()
+                sel.close()
+        return results
+    # DNS解析缓存：主机名 -> (IP或None, 过期时间戳)，解析失败也缓存，避免反复打资源解析器
+    _dns_cache = {}
+    _dns_cache_ttl = 300  # 秒
+
+    @staticmethod
+    def _prune_cache(cache, maxsize):
+        """缓存超出上限时按插入顺序淘汰最老的条目，长驻GUI会话内存有界"""
+        while len(cache) > maxsize:
+            cache.pop(next(iter(cache)), None)
+
+    def _resolve(self, host):
+        """解析主机名到IP（带TTL缓存），失败时返回None"""
+        cached = self._dns_cache.get(host)
+        now = time.time()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        try:
+            ip = socket.gethostbyname(host)
+        except Exception:
+            ip = None
+        self._dns_cache[host] = (ip, now + self._dns_cache_ttl)
+        self._prune_cache(self._dns_cache, 10000)
+        return ip
+
     # 添加位置缓存字典，避免重复请求相同的IP
     _location_cache = {}
+    # 位置缓存的磁盘副本，重启后不必重新查询同样的IP
+    _location_cache_file = os.path.join(LOG_DIR, "location_cache.json")
+    _location_cache_loaded = False
+    # 所有地理位置查询都打向ip-api.com，共享会话复用TCP连接（keep-alive），
+    # 免去每个流一次的握手开销；挂载连接池适配器，允许多个检测线程并发复用连接
+    _geo_session = requests.Session()
+    _geo_session.mount('http://', requests.adapters.HTTPAdapter(
+        pool_connections=16, pool_maxsize=32, max_retries=1))
+
+    @classmethod
+    def _load_location_cache(cls):
+        """从磁盘载入地理位置缓存（进程内只做一次）"""
+        if cls._location_cache_loaded:
+            return
+        cls._location_cache_loaded = True
+        try:
+            with open(cls._location_cache_file, 'r', encoding='utf-8') as f:
+                cls._location_cache.update(json.load(f))
+            logger.debug(f"已载入 {len(cls._location_cache)} 条地理位置缓存")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"载入地理位置缓存失败: {str(e)}")
+
+    @classmethod
+    def _save_location_cache(cls):
+        """把地理位置缓存写回磁盘（写临时文件后原子替换）"""
+        try:
+            tmp_file = cls._location_cache_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(cls._location_cache, f, ensure_ascii=False)
+            os.replace(tmp_file, cls._location_cache_file)
+        except Exception as e:
+            logger.debug(f"保存地理位置缓存失败: {str(e)}")
+
+    @staticmethod
+    def _format_location(data):
+        """把ip-api.com返回的一条记录拼成"国家, 省, 市"形式"""
+        country = data.get('country', '未知')
+        region = data.get('regionName', '')
+        city = data.get('city', '')
+        location_parts = []
+        if country:
+            location_parts.append(country)
+        if region and region != city:  # 避免重复信息
+            location_parts.append(region)
+        if city:
+            location_parts.append(city)
+        return ", ".join(location_parts)
+
+    def _prefetch_locations(self, streams):
+        """批量预取所有流的地理位置
+
+        去重主机 -> 解析IP -> 按100个一批调用ip-api.com的batch接口，
+        把N次串行查询压缩成N/100次；结果进入缓存后，检测路径里的
+        _get_location退化为纯字典查找。
+        """
+        hosts = {h.split(':', 1)[0] for h in
+                 (_host_of(s.get('url', '')) for s in streams) if h}
+        ips = []
+        seen = set()
+        for host in hosts:
+            if self._stop_requested.is_set():
+                return
+            ip = self._resolve(host)
+            if ip is None:
+                continue
+            if ip in seen or ip in self._location_cache or self._is_private_ip(ip):
+                continue
+            seen.add(ip)
+            ips.append(ip)
+        for i in range(0, len(ips), 100):
+            if self._stop_requested.is_set():
+                break
+            batch = ips[i:i + 100]
+            try:
+                response = self._geo_session.post(
+                    "http://ip-api.com/batch?lang=zh-CN", json=batch, timeout=5)
+                if response.status_code != 200:
+                    continue
+                for data in response.json():
+                    ip = data.get('query', '')
+                    if not ip:
+                        continue
+                    if data.get('status') == 'success':
+                        self._location_cache[ip] = self._format_location(data) or "未知"
+                    else:
+                        self._location_cache[ip] = "未知"
+            except Exception as e:
+                logger.debug(f"批量获取位置信息时出错: {str(e)}")
+        if ips:
+            self._prune_cache(self._location_cache, 10000)
+            self._save_location_cache()
+
     def _get_location(self, host):
         """
         尝试确定主机的地理位置
@@ -441,11 +792,8 @@ class IPTVChecker:
             # 仅提取不带端口的主机名
             if ':' in host:
                 host = host.split(':', 1)[0]
-            # 如果是主机名，则尝试解析IP
-            try:
-                ip = socket.gethostbyname(host)
-            except:
-                ip = host
+            # 如果是主机名，则尝试解析IP（带TTL缓存）
+            ip = self._resolve(host) or host
             # 检查它是否是一个私有IP
             if self._is_private_ip(ip):
                 return "本地网络"
@@ -456,22 +804,12 @@ class IPTVChecker:
             try:
                 # 减少超时时间，避免长时间阻塞
                 # 添加lang=zh-CN参数获取中文结果
-                response = requests.get(f"http://ip-api.com/json/{ip}?lang=zh-CN", timeout=1)
+                response = self._geo_session.get(f"http://ip-api.com/json/{ip}?lang=zh-CN", timeout=1)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('status') == 'success':
-                        country = data.get('country', '未知')
-                        region = data.get('regionName', '')
-                        city = data.get('city', '')
-                        location_parts = []
-                        if country:
-                            location_parts.append(country)
-                        if region and region != city:  # 避免重复信息
-                            location_parts.append(region)
-                        if city:
-                            location_parts.append(city)
-                        if location_parts:
-                            location = ", ".join(location_parts)
+                        location = self._format_location(data)
+                        if location:
                             # 缓存结果
                             self._location_cache[ip] = location
                             return location
@@ -480,38 +818,27 @@ class IPTVChecker:
                 pass
             # 缓存未知结果，避免重复请求
             self._location_cache[ip] = "未知"
+            self._prune_cache(self._location_cache, 10000)
             return "未知"
         except Exception as e:
             logger.debug(f"获取位置时出错{host}: {str(e)}")
             return "未知"
-    def _is_private_ip(self, ip):
-        """检查一个IP地址是否在私有IP空间内"""
+    # 私有/回环地址段：(网络前缀, 掩码)，模块加载时算好，判定只剩一次位与比较
+    _PRIVATE_NETS = (
+        (0x0A000000, 0xFF000000),  # 10.0.0.0/8
+        (0xAC100000, 0xFFF00000),  # 172.16.0.0/12
+        (0xC0A80000, 0xFFFF0000),  # 192.168.0.0/16
+        (0x7F000000, 0xFF000000),  # 127.0.0.0/8
+    )
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _is_private_ip(ip):
+        """检查一个IP地址是否在私有IP空间内（带缓存）"""
         try:
-            # Convert string to IP object for easier comparison
-            ip_obj = socket.inet_aton(ip)
-            ip_int = int.from_bytes(ip_obj, byteorder='big')
-            # Check private IP ranges
-            private_ranges = [
-                (socket.inet_aton('10.0.0.0'), socket.inet_aton('10.255.255.255')),
-                (socket.inet_aton('172.16.0.0'), socket.inet_aton('172.31.255.255')),
-                (socket.inet_aton('192.168.0.0'), socket.inet_aton('192.168.255.255')),
-                (socket.inet_aton('127.0.0.0'), socket.inet_aton('127.255.255.255'))
-            ]
-            for start, end in private_ranges:
-                start_int = int.from_bytes(start, byteorder='big')
-                end_int = int.from_bytes(end, byteorder='big')
-                if start_int <= ip_int <= end_int:
-                    return True
-            return False
-        except:
+            ip_int = int.from_bytes(socket.inet_aton(ip), byteorder='big')
+        except OSError:
             return False
-    def _resolution_to_pixels(self, resolution):
-        """优化后的分辨率解析函数"""
-        # 提取分辨率数值
-        if 'x' in resolution:
-            try:
-                width, height = map(int, resolution.split('x', 1))
-                return _resolution_to_pixels_fast(width, height)
-            except:
-                pass
-        return 0
\ No newline at end of file
+        return any(ip_int & mask == net for net, mask in IPTVChecker._PRIVATE_NETS)
+    # 保留方法形式的入口，内部直接走模块级的缓存版本
+    _resolution_to_pixels = staticmethod(_resolution_to_pixels)
\ No newline at end of file
@@ -100,6 +100,8 @@ class VideoPlayer(QMainWindow):
         self.media_player.mediaStatusChanged.connect(self.handle_media_status)
         
         self.is_stream = False
+        self._duration_str = "00:00"  # 总时长文本只在时长变化时格式化一次
+        self._last_pos_secs = -1  # 上次显示到标签的秒数
         self.update_toggle_button()
 
     def toggle_play_pause(self):
@@ -170,12 +172,20 @@ class VideoPlayer(QMainWindow):
         # 只有在不是流的情况下才更新滑块和标签
         if not self.is_stream:
             self.position_slider.setValue(position)
-            self.time_label.setText(f"{self.format_time(position)} / {self.format_time(self.media_player.duration())}")
+            # 标签只精确到秒：同一秒内的多次positionChanged不再重排文本，
+            # 总时长部分用duration_changed时缓存好的字符串
+            secs = position // 1000
+            if secs != self._last_pos_secs:
+                self._last_pos_secs = secs
+                self.time_label.setText(f"{self.format_time(position)} / {self._duration_str}")
 
     def duration_changed(self, duration):
         # 只有在不是流的情况下才更新滑块范围
         if not self.is_stream:
             self.position_slider.setRange(0, duration)
+        # 总时长在一次播放中基本不变，此处格式化一次供每个position刻度复用
+        self._duration_str = self.format_time(duration)
+        self._last_pos_secs = -1
 
     def handle_media_status(self, status):
         # 处理媒体状态变化
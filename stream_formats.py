@@ -1,9 +1,51 @@
 #!/usr/bin/env python3
+import os
 import re
 import time
-from urllib.parse import unquote
+from functools import lru_cache
+from urllib.parse import unquote, urlsplit
 import pandas as pd
 import numpy as np
+
+@lru_cache(maxsize=8192)
+def _split(url):
+    """缓存URL解析结果；urlsplit比urlparse更快且足够提取路径/主机"""
+    return urlsplit(url)
+
+# EXTINF行属性提取的预编译模式，避免在每行上重复查找模式缓存
+_ATTR_RE = re.compile(r'(\w+)="([^"]*)"')
+_LOGO_RE = re.compile(r'tvg-logo="([^"]*)"')
+_GROUP_RE = re.compile(r'group-title="([^"]*)"')
+
+def _decode(data):
+    """按UTF-8解码字节块，失败时回退latin-1"""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+def _iter_lines(file_path):
+    """以64KB块流式读取文件，逐行产出 (line, 已读字节数)
+
+    不把整个文件读入内存，多百MB的播放列表也保持恒定内存占用；
+    只在完整的行边界(b'\\n')上解码，不会把多字节字符切在块中间。
+    """
+    buf = b''
+    bytes_read = 0
+    with open(file_path, 'rb', buffering=1 << 20) as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            bytes_read += len(chunk)
+            nl = chunk.rfind(b'\n')
+            if nl < 0:
+                buf += chunk
+                continue
+            block = buf + chunk[:nl]
+            buf = chunk[nl + 1:]
+            for line in _decode(block).splitlines():
+                yield line, bytes_read
+    if buf:
+        yield _decode(buf), bytes_read
+
 def parse_m3u(file_path, progress_callback=None, chunk_size=1000):
     """
     解析 M3U/M3U8 播放列表文件为一个流列表。
@@ -15,108 +57,76 @@ def parse_m3u(file_path, progress_callback=None, chunk_size=1000):
     """
     streams = []
     current_stream = None
-    total_lines = 0
-    processed_lines = 0
-    
-    # 首先获取文件总行数，用于进度计算
+
+    # 流式逐行读取，进度按已读字节数报告
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            # 快速计算行数
-            for _ in f:
-                total_lines += 1
-    except UnicodeDecodeError:
-        # 如果 UTF-8 编码失败，尝试使用不同的编码
-        try:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                for _ in f:
-                    total_lines += 1
-        except Exception as e:
-            raise ValueError(f"未能统计文件中的行数: {str(e)}")
+        total_size = os.path.getsize(file_path)
+    except OSError as e:
+        raise ValueError(f"未能读取文件: {str(e)}")
     # 如果文件为空，直接返回
-    if total_lines == 0:
+    if total_size == 0:
         return streams
-    # 读取和处理文件内容
     try:
-        encoding = 'utf-8'
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                first_line = f.readline().strip()
-                if not first_line.startswith('#EXTM3U'):
-                    raise ValueError("不是有效的M3U文件，缺少#EXTM3U头")
-        except UnicodeDecodeError:
-            encoding = 'latin-1'
-            with open(file_path, 'r', encoding=encoding) as f:
-                first_line = f.readline().strip()
-                if not first_line.startswith('#EXTM3U'):
+        # 报告初始进度
+        if progress_callback:
+            progress_callback(0, 0, total_size)
+        first_line = True
+        for processed_lines, (line, bytes_read) in enumerate(_iter_lines(file_path), start=1):
+            if first_line:
+                first_line = False
+                if not line.strip().startswith('#EXTM3U'):
                     raise ValueError("不是有效的M3U文件，缺少#EXTM3U头")
-        # 重新打开文件进行分块处理
-        with open(file_path, 'r', encoding=encoding) as f:
-            # 跳过已经读取的第一行
-            f.readline()
-            processed_lines = 1
-            # 报告初始进度
-            if progress_callback:
-                progress_callback(0, processed_lines, total_lines)
-            lines_buffer = []
-            for line in f:
-                lines_buffer.append(line.strip())
-                processed_lines += 1
-                # 当缓冲区达到指定大小或读取完所有行时处理数据
-                if len(lines_buffer) >= chunk_size or processed_lines >= total_lines:
-                    # 处理缓冲区中的行
-                    for line in lines_buffer:
-                        if not line:
-                            continue
-                        if line.startswith('#EXTINF:'):
-                            # 新的流条目的开始
-                            current_stream = {'status': '未检测', 'resolution': 'N/A', 'response_time': -1}
-                            # 提取流名称和任何其他属性
-                            info_line = line[8:]  # Remove #EXTINF: prefix
-                            # 提取持续时间（在第一个逗号之前）
-                            if ',' in info_line:
-                                duration_part, name_part = info_line.split(',', 1)
-                                try:
-                                    current_stream['duration'] = float(duration_part)
-                                except:
-                                    current_stream['duration'] = -1
-                                current_stream['name'] = name_part.strip()
-                            else:
-                                # 未找到逗号，使用整行作为名称
-                                current_stream['name'] = info_line.strip()
-                            # 提取属性
-                            attributes = re.findall(r'(\w+)="([^"]*)"', line)
-                            for key, value in attributes:
-                                current_stream[key.lower()] = value
-                            # 特别检查tvg-logo属性
-                            logo_match = re.search(r'tvg-logo="([^"]*)"', line)
-                            if logo_match:
-                                current_stream['tvg-logo'] = logo_match.group(1)
-                            # 特别检查group-title属性
-                            group_match = re.search(r'group-title="([^"]*)"', line)
-                            if group_match:
-                                current_stream['group'] = group_match.group(1)
-                                current_stream['group-title'] = group_match.group(1)  # 保持兼容性
-                        elif line.startswith('#EXTVLCOPT:') and current_stream:
-                            # VLC 选项行——可能包含有用信息
-                            if 'http-user-agent' in line:
-                                agent = line.split('http-user-agent=')[-1].strip()
-                                if agent.startswith('"') and agent.endswith('"'):
-                                    agent = agent[1:-1]
-                                current_stream['user_agent'] = agent
-                        elif line.startswith('#') or not line:
-                            # 其他注释或空行，忽略
-                            continue
-                        elif current_stream is not None:
-                            # 这应该是网址
-                            current_stream['url'] = line
-                            streams.append(current_stream)
-                            current_stream = None
-                    # 清空缓冲区
-                    lines_buffer = []
-                    # 报告进度
-                    if progress_callback:
-                        progress = int((processed_lines / total_lines) * 100)
-                        progress_callback(progress, processed_lines, total_lines)
+                continue
+            line = line.strip()
+            if line:
+                if line.startswith('#EXTINF:'):
+                    # 新的流条目的开始
+                    current_stream = {'status': '未检测', 'resolution': 'N/A', 'response_time': -1}
+                    # 提取流名称和任何其他属性
+                    info_line = line[8:]  # Remove #EXTINF: prefix
+                    # 提取持续时间（在第一个逗号之前）
+                    if ',' in info_line:
+                        duration_part, name_part = info_line.split(',', 1)
+                        try:
+                            current_stream['duration'] = float(duration_part)
+                        except:
+                            current_stream['duration'] = -1
+                        current_stream['name'] = name_part.strip()
+                    else:
+                        # 未找到逗号，使用整行作为名称
+                        current_stream['name'] = info_line.strip()
+                    # 提取属性（预编译模式，一次findall拿到全部键值对）
+                    for key, value in _ATTR_RE.findall(line):
+                        current_stream[key.lower()] = value
+                    # 特别检查tvg-logo属性
+                    logo_match = _LOGO_RE.search(line)
+                    if logo_match:
+                        current_stream['tvg-logo'] = logo_match.group(1)
+                    # 特别检查group-title属性
+                    group_match = _GROUP_RE.search(line)
+                    if group_match:
+                        current_stream['group'] = group_match.group(1)
+                        current_stream['group-title'] = group_match.group(1)  # 保持兼容性
+                elif line.startswith('#EXTVLCOPT:') and current_stream:
+                    # VLC 选项行——可能包含有用信息
+                    if 'http-user-agent' in line:
+                        agent = line.split('http-user-agent=')[-1].strip()
+                        if agent.startswith('"') and agent.endswith('"'):
+                            agent = agent[1:-1]
+                        current_stream['user_agent'] = agent
+                elif line.startswith('#'):
+                    # 其他注释行，忽略
+                    pass
+                elif current_stream is not None:
+                    # 这应该是网址
+                    current_stream['url'] = line
+                    streams.append(current_stream)
+                    current_stream = None
+            # 按chunk_size的节奏报告进度
+            if progress_callback and processed_lines % chunk_size == 0:
+                progress_callback(bytes_read * 100 // total_size, bytes_read, total_size)
+        if progress_callback:
+            progress_callback(100, total_size, total_size)
     except Exception as e:
         raise ValueError(f"解析M3U文件时出错: {str(e)}")
     return streams
@@ -137,127 +147,97 @@ def parse_txt(file_path, progress_callback=None, chunk_size=1000):
     带有流信息的字典列表。
     """
     streams = []
-    total_lines = 0
-    processed_lines = 0
-    # 首先获取文件总行数，用于进度计算
+
+    # 流式逐行读取，进度按已读字节数报告
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            # 快速计算行数
-            for _ in f:
-                total_lines += 1
-    except UnicodeDecodeError:
-        # 如果 UTF-8 编码失败，尝试使用不同的编码
-        try:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                for _ in f:
-                    total_lines += 1
-        except Exception as e:
-            raise ValueError(f"未能统计文件中的行数: {str(e)}")
-    
+        total_size = os.path.getsize(file_path)
+    except OSError as e:
+        raise ValueError(f"未能读取文件: {str(e)}")
     # 如果文件为空，直接返回
-    if total_lines == 0:
+    if total_size == 0:
         return streams
-    
-    # 读取和处理文件内容
+
     try:
-        encoding = 'utf-8'
-        try:
-            # 尝试以UTF-8打开文件
-            with open(file_path, 'r', encoding=encoding) as f:
-                f.readline()  # 测试是否可以读取
-        except UnicodeDecodeError:
-            encoding = 'latin-1'
-        
-        # 重新打开文件进行分块处理
-        with open(file_path, 'r', encoding=encoding) as f:
-            # 报告初始进度
-            if progress_callback:
-                progress_callback(0, 0, total_lines)
-            
-            lines_buffer = []
-            current_group = None  # 当前频道分类
-            
-            for i, line in enumerate(f):
-                lines_buffer.append(line.strip())
-                processed_lines += 1
-                
-                # 当缓冲区达到指定大小或读取完所有行时处理数据
-                if len(lines_buffer) >= chunk_size or processed_lines >= total_lines:
-                    # 处理缓冲区中的行
-                    for line in lines_buffer:
-                        if not line or (line.startswith('#') and ' ' not in line):
-                            # 空行或简单注释
-                            continue
-                        
-                        # 检查是否是分类标记行 "分类,#genre#"
-                        if ',' in line and line.endswith('#genre#'):
-                            current_group = line.split(',')[0].strip()
-                            continue
-                        
-                        stream = {'status': '未检测', 'resolution': 'N/A', 'response_time': -1}
-                        
-                        # 如果有当前分类，添加到流信息中
-                        if current_group:
-                            stream['group'] = current_group
-                            stream['group-title'] = current_group  # 保持兼容性
-                        
-                        # 检查常见格式
-                        if ',' in line:
-                            # 可能是名称、网址或网址、名称的格式
-                            parts = [p.strip() for p in line.split(',', 1)]
-                            
-                            # 检查第一部分是否是一个 URL
-                            if parts[0].startswith(('http://', 'https://', 'rtmp://', 'rtsp://')):
-                                # URL在前面，名称在后面
-                                stream['url'] = parts[0]
-                                stream['name'] = parts[1] if len(parts) > 1 else _extract_name_from_url(parts[0])
-                            else:
-                                # 名称在前面，URL在后面
-                                stream['name'] = parts[0]
-                                # 检查是否有#分割的多URL (支持 名称,URL1#URL2 格式)
-                                if len(parts) > 1:
-                                    stream['url'] = parts[1]
-                                else:
-                                    stream['url'] = ''
-                        
-                        elif '#' in line and not line.startswith('#'):
-                            # 检查是否是"URL #名称"格式或是包含多个URL的格式
-                            parts = line.split('#')
-                            # 如果第一个部分是URL，并且后面的部分也是URL，则这是多URL格式
-                            if parts[0].startswith(('http://', 'https://', 'rtmp://', 'rtsp://')) and \
-                               any(p.strip().startswith(('http://', 'https://', 'rtmp://', 'rtsp://')) for p in parts[1:]):
-                                # 这是多URL格式，但没有名称，需要从URL提取名称
-                                stream['url'] = line  # 保持整行作为URL（包含#）
-                                stream['name'] = _extract_name_from_url(parts[0])
-                            else:
-                                # 传统的"URL #名称"格式
-                                stream['url'] = parts[0]
-                                stream['name'] = parts[1] if len(parts) > 1 else _extract_name_from_url(parts[0])
-                        else:
-                            # 只是一个 URL 或未知格式
-                            if line.startswith('#'):
-                                # 注释行，可能包含名称
-                                stream['name'] = line[1:].strip()
-                                continue
-                            elif line.startswith(('http://', 'https://', 'rtmp://', 'rtsp://')):
-                                stream['url'] = line
-                                stream['name'] = _extract_name_from_url(line)
-                            else:
-                                # 不是可识别的 URL 格式，用作名称
-                                stream['name'] = line
-                                continue
-                        
-                        # 只有当流有URL时才添加
-                        if stream.get('url'):
-                            stream['id'] = len(streams) + 1  # 使用流列表长度+1作为ID
-                            streams.append(stream)
-                    
-                    # 清空缓冲区
-                    lines_buffer = []
-                    # 报告进度
-                    if progress_callback:
-                        progress = int((processed_lines / total_lines) * 100)
-                        progress_callback(progress, processed_lines, total_lines)
+        # 报告初始进度
+        if progress_callback:
+            progress_callback(0, 0, total_size)
+
+        current_group = None  # 当前频道分类
+
+        for processed_lines, (line, bytes_read) in enumerate(_iter_lines(file_path), start=1):
+            line = line.strip()
+            # 按chunk_size的节奏报告进度
+            if progress_callback and processed_lines % chunk_size == 0:
+                progress_callback(bytes_read * 100 // total_size, bytes_read, total_size)
+
+            if not line or (line.startswith('#') and ' ' not in line):
+                # 空行或简单注释
+                continue
+
+            # 检查是否是分类标记行 "分类,#genre#"
+            if ',' in line and line.endswith('#genre#'):
+                current_group = line.split(',')[0].strip()
+                continue
+
+            stream = {'status': '未检测', 'resolution': 'N/A', 'response_time': -1}
+
+            # 如果有当前分类，添加到流信息中
+            if current_group:
+                stream['group'] = current_group
+                stream['group-title'] = current_group  # 保持兼容性
+
+            # 检查常见格式
+            if ',' in line:
+                # 可能是名称、网址或网址、名称的格式
+                parts = [p.strip() for p in line.split(',', 1)]
+
+                # 检查第一部分是否是一个 URL
+                if parts[0].startswith(('http://', 'https://', 'rtmp://', 'rtsp://')):
+                    # URL在前面，名称在后面
+                    stream['url'] = parts[0]
+                    stream['name'] = parts[1] if len(parts) > 1 else _extract_name_from_url(parts[0])
+                else:
+                    # 名称在前面，URL在后面
+                    stream['name'] = parts[0]
+                    # 检查是否有#分割的多URL (支持 名称,URL1#URL2 格式)
+                    if len(parts) > 1:
+                        stream['url'] = parts[1]
+                    else:
+                        stream['url'] = ''
+
+            elif '#' in line and not line.startswith('#'):
+                # 检查是否是"URL #名称"格式或是包含多个URL的格式
+                parts = line.split('#')
+                # 如果第一个部分是URL，并且后面的部分也是URL，则这是多URL格式
+                if parts[0].startswith(('http://', 'https://', 'rtmp://', 'rtsp://')) and \
+                   any(p.strip().startswith(('http://', 'https://', 'rtmp://', 'rtsp://')) for p in parts[1:]):
+                    # 这是多URL格式，但没有名称，需要从URL提取名称
+                    stream['url'] = line  # 保持整行作为URL（包含#）
+                    stream['name'] = _extract_name_from_url(parts[0])
+                else:
+                    # 传统的"URL #名称"格式
+                    stream['url'] = parts[0]
+                    stream['name'] = parts[1] if len(parts) > 1 else _extract_name_from_url(parts[0])
+            else:
+                # 只是一个 URL 或未知格式
+                if line.startswith('#'):
+                    # 注释行，可能包含名称
+                    stream['name'] = line[1:].strip()
+                    continue
+                elif line.startswith(('http://', 'https://', 'rtmp://', 'rtsp://')):
+                    stream['url'] = line
+                    stream['name'] = _extract_name_from_url(line)
+                else:
+                    # 不是可识别的 URL 格式，用作名称
+                    stream['name'] = line
+                    continue
+
+            # 只有当流有URL时才添加
+            if stream.get('url'):
+                stream['id'] = len(streams) + 1  # 使用流列表长度+1作为ID
+                streams.append(stream)
+        if progress_callback:
+            progress_callback(100, total_size, total_size)
     except Exception as e:
         raise ValueError(f"解析TXT文件时出错: {str(e)}")
     return streams
@@ -268,36 +248,40 @@ def export_m3u(streams, file_path):
     参数：streams（流的列表，其中每个流是一个字典），file_path（保存 M3U 文件的路径）。
     返回值：无。
     """
-    with open(file_path, 'w', encoding='utf-8') as f:
+    # 每个流的条目先在内存拼成单个字符串，按批写出，
+    # 避免每个字段都走一遍Python IO层（原先每个流5-7次f.write）
+    with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
         # Write M3U header 写入M3U头
-        f.write("#EXTM3U\n")
+        parts = ["#EXTM3U\n"]
         for stream in streams:
             name = stream.get('name', '未命名 Stream')
             url = stream.get('url', '')
             if not url:
                 continue
             # 编写带有元数据的EXTINF行
-            f.write(f'#EXTINF:-1 tvg-id="{stream.get("id", "")}" tvg-name="{name}"')
+            entry = f'#EXTINF:-1 tvg-id="{stream.get("id", "")}" tvg-name="{name}"'
             # 如果可用则添加分辨率
             # resolution = stream.get('resolution', 'N/A') # 注释掉获取分辨率
             # if resolution != 'N/A': # 注释掉判断分辨率
-            #     f.write(f' tvg-resolution="{resolution}"') # 注释掉写入分辨率
+            #     entry += f' tvg-resolution="{resolution}"' # 注释掉写入分辨率
             # 如果可用，添加组标题
             group_title = stream.get('group', stream.get('group-title', 'IPTV'))
-            # 如果可用则添加位置信息
-            # location = stream.get('location', '')
-            # if location:
-            #     f.write(f' tvg-country="{location}"')
             # 如果有可用的标志则添加标志
             logo = stream.get('tvg-logo', '')
             if logo:
-                f.write(f' tvg-logo="{logo}"')
-            f.write(f' group-title="{group_title}",{name}\n')
+                entry += f' tvg-logo="{logo}"'
+            entry += f' group-title="{group_title}",{name}\n'
             # 添加任何自定义的用户代理
             if 'user_agent' in stream:
-                f.write(f'#EXTVLCOPT:http-user-agent={stream["user_agent"]}\n')
+                entry += f'#EXTVLCOPT:http-user-agent={stream["user_agent"]}\n'
             # Write the URL
-            f.write(f'{url}\n')
+            parts.append(entry + url + '\n')
+            # 每1000个条目合并写出一次
+            if len(parts) >= 1000:
+                f.write(''.join(parts))
+                parts = []
+        if parts:
+            f.write(''.join(parts))
 def export_txt(streams, file_path):
     """
     导出流为 TXT 格式
@@ -306,11 +290,11 @@ def export_txt(streams, file_path):
         file_path：保存 TXT 文件的路径
     返回： 无
     """
-    with open(file_path, 'w', encoding='utf-8') as f:
+    with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
         # Write header comment
         now = time.strftime("%Y-%m-%d %H:%M:%S")
-        f.write(f"# IPTV Stream 列表 - 生成时间 {now}\n")
-        f.write(f"# 总数: {len(streams)}\n\n")
+        parts = [f"# IPTV Stream 列表 - 生成时间 {now}\n",
+                 f"# 总数: {len(streams)}\n\n"]
         # 按分组整理流
         groups = {}
         ungrouped = []
@@ -326,19 +310,18 @@ def export_txt(streams, file_path):
                 groups[group].append((name, url))
             else:
                 ungrouped.append((name, url))
-        # 先写入分组的流
+        # 先写入分组的流（整组拼成字符串后一次写出）
         for group, group_streams in groups.items():
             # 写入分组标记
-            f.write(f"{group},#genre#\n")
+            parts.append(f"{group},#genre#\n")
             # 写入该分组下的所有流
-            for name, url in group_streams:
-                f.write(f"{name},{url}\n")
+            parts.extend(f"{name},{url}\n" for name, url in group_streams)
             # 分组之间添加空行
-            f.write("\n")
+            parts.append("\n")
         # 写入未分组的流
         if ungrouped:
-            for name, url in ungrouped:
-                f.write(f"{name},{url}\n")
+            parts.extend(f"{name},{url}\n" for name, url in ungrouped)
+        f.write(''.join(parts))
 def _extract_name_from_url(url):
     """
     从 URL 中提取一个合理的名称。
@@ -348,9 +331,8 @@ def _extract_name_from_url(url):
         提取的名称或"未命名流"。
     """
     try:
-        # 尝试从路径中提取有意义的部分。
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
+        # 尝试从路径中提取有意义的部分（解析结果带缓存）。
+        parsed = _split(url)
         path = unquote(parsed.path)
         # 检查路径是否有可识别的部分
         if path:
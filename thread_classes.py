@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import re
 import requests
 from PySide6.QtCore import QThread, Signal
 from loguru import logger
@@ -7,6 +8,9 @@ from utils import create_temp_directory, clean_temp_directory, is_valid_url
 from stream_formats import parse_m3u, parse_txt
 from config import REQUEST_TIMEOUT, CONCURRENT_CHECKS
 
+# 从任意文本中提取URL的预编译模式，对整个缓冲区做一次C层扫描
+_URL_EXTRACT_RE = re.compile(r'https?://[^\s,"\'<>]+')
+
 class ImportUrlThread(QThread):
     """URL导入线程类
     
@@ -187,19 +191,9 @@ class ImportUrlThread(QThread):
                 
                 # 如果没有成功解析为M3U或TXT，或者解析失败，尝试提取URL
                 if not self.streams_to_add:
-                    lines = self.url_content.split('\n')
-                    extracted_urls = []
-                    
-                    for line in lines:
-                        line = line.strip()
-                        # 检查行是否包含URL
-                        if 'http://' in line or 'https://' in line:
-                            # 尝试提取URL
-                            import re
-                            url_match = re.search(r'(https?://[^\s,]+)', line)
-                            if url_match:
-                                extracted_urls.append(url_match.group(1))
-                    
+                    # 一次finditer扫描整个文本，替代逐行strip+子串判断+search
+                    extracted_urls = _URL_EXTRACT_RE.findall(self.url_content)
+
                     if extracted_urls:
                         logger.info(f"从文本中提取到 {len(extracted_urls)} 个URL")
                         # 将提取的URL作为单独的流添加
@@ -299,6 +293,61 @@ class ImportFileThread(QThread):
         """取消导入操作"""
         self.is_cancelled = True
 
+class ExportThread(QThread):
+    """文件导出线程类：在后台把流列表写成M3U/TXT文件，不阻塞界面"""
+    finished_signal = Signal(str, int)  # error_message(空串表示成功), 导出数量
+    progress_signal = Signal(int, int, int)  # 进度百分比, 当前处理数, 总数
+
+    def __init__(self, streams, file_path, format_type, parent=None):
+        super().__init__(parent)
+        self.streams = streams
+        self.file_path = file_path
+        self.format_type = format_type
+
+    def run(self):
+        total = len(self.streams)
+        exported = 0
+        is_m3u = self.format_type.lower() == 'm3u'
+        try:
+            # 条目在内存按批拼接，每1000条合并写出一次并报告进度
+            with open(self.file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                parts = ["#EXTM3U\n"] if is_m3u else []
+                parts_append = parts.append  # 循环内预绑定，省掉逐次属性查找
+                for i, stream in enumerate(self.streams, start=1):
+                    name = stream.get('name', 'Unknown')
+                    url = stream.get('url', '')
+                    if is_m3u:
+                        # EXTINF行由片段列表一次join而成，可选属性只追加片段，
+                        # 不反复重建中间字符串
+                        frag = ['#EXTINF:-1 tvg-name="', name, '"']
+                        group = stream.get('group', '')
+                        country = stream.get('country', '')
+                        logo = stream.get('logo', '')
+                        if group:
+                            frag += [' group-title="', group, '"']
+                        if country:
+                            frag += [' tvg-country="', country, '"']
+                        if logo:
+                            frag += [' tvg-logo="', logo, '"']
+                        frag += [',', name, '\n', url, '\n']
+                        parts_append(''.join(frag))
+                    else:
+                        parts_append(f'{name},{url}\n')
+                    exported += 1
+                    if len(parts) >= 1000:
+                        f.write(''.join(parts))
+                        parts.clear()  # 原地清空，保持parts_append绑定有效
+                        self.progress_signal.emit(i * 100 // total, i, total)
+                if parts:
+                    f.write(''.join(parts))
+                self.progress_signal.emit(100, total, total)
+            logger.info(f"已导出 {exported} 个流到 {self.file_path}")
+            self.finished_signal.emit("", exported)
+        except Exception as e:
+            error_message = f"导出失败: {str(e)}"
+            logger.error(error_message)
+            self.finished_signal.emit(error_message, exported)
+
 class StreamCheckThread(QThread):
     """用于在后台检查流的线程"""
     progress_signal = Signal(int, int, int)  # 进度百分比, 当前处理行数, 总行数
@@ -336,8 +385,10 @@ class StreamCheckThread(QThread):
             self.checker.skip_same_domain_invalid = self.skip_same_domain_invalid
             
             # 使用线程池执行流检查
+            import math
             from concurrent.futures import ThreadPoolExecutor, as_completed
-            
+            from concurrent.futures import TimeoutError as FuturesTimeoutError
+
             max_workers = min(CONCURRENT_CHECKS, len(self.streams))
             
             # 创建流索引映射，用于跟踪每个流在原始列表中的位置
@@ -353,36 +404,53 @@ class StreamCheckThread(QThread):
                 # 处理完成的任务
                 completed = 0
                 total = len(self.streams)
-                
-                for future in as_completed(futures):
-                    if not self.is_running:
-                        # 取消所有未完成的任务
-                        for f in futures:
-                            if not f.done():
-                                f.cancel()
-                        break
-                    
-                    try:
-                        # 获取检测结果
-                        original_stream = futures[future]
-                        updated_stream = future.result()
-                        
-                        # 找到流在原始列表中的索引
-                        stream_idx = stream_indices.get(id(original_stream), -1)
-                        
-                        # 发送流更新信号
-                        if stream_idx >= 0:
-                            self.stream_updated_signal.emit(stream_idx, updated_stream)
-                        
-                        # 更新进度
-                        completed += 1
-                        progress = int(completed / total * 100)
-                        self.progress_signal.emit(progress, completed, total)
-                        
-                    except Exception as e:
-                        import traceback
-                        traceback.print_exc()
-                        logger.error(f"流检查线程错误: {str(e)}")
+
+                # 为整批检测设置总时间预算：按波次数放大单流超时，
+                # 个别卡死的流不会让完成信号无限期延后
+                timeout_budget = REQUEST_TIMEOUT * 1.2 * max(1, math.ceil(total / max_workers))
+
+                try:
+                    for future in as_completed(futures, timeout=timeout_budget):
+                        if not self.is_running:
+                            # 取消所有未完成的任务
+                            for f in futures:
+                                if not f.done():
+                                    f.cancel()
+                            break
+
+                        try:
+                            # 获取检测结果
+                            original_stream = futures[future]
+                            updated_stream = future.result()
+
+                            # 找到流在原始列表中的索引
+                            stream_idx = stream_indices.get(id(original_stream), -1)
+
+                            # 发送流更新信号
+                            if stream_idx >= 0:
+                                self.stream_updated_signal.emit(stream_idx, updated_stream)
+
+                            # 更新进度
+                            completed += 1
+                            progress = int(completed / total * 100)
+                            self.progress_signal.emit(progress, completed, total)
+
+                        except Exception as e:
+                            import traceback
+                            traceback.print_exc()
+                            logger.error(f"流检查线程错误: {str(e)}")
+                except FuturesTimeoutError:
+                    # 预算耗尽：取消剩余任务并把它们标记为超时
+                    cancelled = 0
+                    for f, stream in futures.items():
+                        if not f.done():
+                            f.cancel()
+                            cancelled += 1
+                            stream['status'] = '错误: 超时'
+                            stream_idx = stream_indices.get(id(stream), -1)
+                            if stream_idx >= 0:
+                                self.stream_updated_signal.emit(stream_idx, stream)
+                    logger.warning(f"检测总预算 {timeout_budget:.0f} 秒耗尽，已取消 {cancelled} 个未完成任务")
             
             # 如果需要自动清除无效源
             if self.auto_clear and self.is_running:
@@ -400,8 +468,9 @@ class StreamCheckThread(QThread):
             traceback.print_exc()
             logger.error(f"流检查线程错误: {str(e)}")
         finally:
-            # 完成后，发出完成信号
+            # 完成后，发出完成信号；检查器是一次性的，顺手停掉它的后台刷新线程
             self.is_running = False
+            self.checker.shutdown()
             self.finished_signal.emit()
     
     def stop(self):
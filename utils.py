@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 import os
+import re
 import shutil
-from urllib.parse import urlparse
+import functools
+from urllib.parse import urlsplit
 from loguru import logger
+
+# 预编译的URL前缀模式，供快速预筛使用
+URL_PREFIX_RE = re.compile(r'https?://', re.IGNORECASE)
+
 def create_temp_directory(prefix="iptv_checker_"):
     """
     创建一个用于工作文件的临时目录。
@@ -35,16 +41,18 @@ def clean_temp_directory(dir_path):
             logger.error(f"Failed to clean temporary directory: {e}")
             return False
     return False
+@functools.lru_cache(maxsize=4096)
 def is_valid_url(url):
     """
     检查一个 URL 是否有效。
+    结果按URL缓存，IPTV列表中重复出现的地址只解析一次。
     参数：
     url：要检查的 URL
     返回：
     bool：如果是有效的 URL 则为真，否则为假。
     """
     try:
-        result = urlparse(url)
+        result = urlsplit(url)
         return all([result.scheme, result.netloc])
     except:
         return False